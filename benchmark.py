@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Benchmark the conversion and display pipeline on the simulated panel.
+
+Builds a synthetic corpus like generate-circles.js (transparent PNGs with
+1-3 black/red circles) and generate-simple.js (gradient cubes and a sphere
+on black), then for the shared pipeline and every slideshow variant
+measures each stage's p50/p95 latency and peak Python allocations, runs
+the variant's main loop end to end for a number of frames, and records
+peak RSS. Each variant runs in a fresh process.
+
+    python3 benchmark.py                          # everything, writes bench-results.json
+    python3 benchmark.py --variants slideshow-ultra-ghost.py --repeat 10
+    python3 benchmark.py --compare old-results.json
+
+Results are JSON (with the git commit) so runs can be compared across
+commits; --compare prints the change in p50 per stage.
+"""
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+WIDTH, HEIGHT = 800, 480
+
+VARIANTS = [
+    "slideshow.py",
+    "slideshow-no-refresh.py",
+    "slideshow-minimal.py",
+    "slideshow-ghost-simple.py",
+    "slideshow-direct-buffer.py",
+    "slideshow-ultra-ghost.py",
+    "slideshow-memory-canvas.py",
+    "slideshow-memory-partial.py",
+    "slideshow-circular-refresh.py",
+]
+PIPELINE = "pipeline"  # the shared epaper stages, measured once
+# The canvas scripts stack transparent overlays; an opaque scene is all
+# "content" to them.
+OVERLAY_ONLY = {
+    "slideshow-ultra-ghost.py",
+    "slideshow-memory-canvas.py",
+    "slideshow-memory-partial.py",
+    "slideshow-circular-refresh.py",
+}
+FRAME_TICK = 987654    # stands in for DELAY_SECONDS so frame boundaries can be seen
+
+
+# -- synthetic corpus ------------------------------------------------------
+
+def make_circles(path, rng):
+    """Transparent frame with 1-3 black or red circles, like generate-circles.js"""
+    from PIL import Image, ImageDraw
+    img = Image.new("RGBA", (WIDTH, HEIGHT), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    for _ in range(rng.randint(1, 3)):
+        x = 100 + rng.random() * (WIDTH - 200)
+        y = 100 + rng.random() * (HEIGHT - 200)
+        r = 30 + rng.random() * 80
+        draw.ellipse((x - r, y - r, x + r, y + r), fill=rng.choice([(0, 0, 0, 255), (255, 0, 0, 255)]))
+    img.save(path)
+
+
+def make_scene(path, rng):
+    """Gradient cubes and a sphere on black, like generate-simple.js"""
+    import numpy as np
+    from PIL import Image
+    canvas = np.zeros((HEIGHT, WIDTH, 3), np.float32)
+    yy, xx = np.mgrid[0:HEIGHT, 0:WIDTH].astype(np.float32)
+
+    def ramp(t, stops):
+        t = np.clip(t, 0, 1)[..., None]
+        out = np.empty(t.shape[:-1] + (3,), np.float32)
+        positions = [p for p, _ in stops]
+        for c in range(3):
+            out[..., c] = np.interp(t[..., 0], positions, [col[c] for _, col in stops])
+        return out
+
+    for _ in range(rng.randint(5, 35)):
+        size = rng.random() * 120 + 10
+        x0, y0 = rng.random() * (WIDTH - size), rng.random() * (HEIGHT - size)
+        face = size * 0.8
+        inside = (xx >= x0) & (xx < x0 + face) & (yy >= y0) & (yy < y0 + face)
+        t = ((xx - x0) + (yy - y0)) / (2 * face)
+        shade = ramp(t, [(0, (255, 102, 102)), (0.5, (153, 153, 153)), (1, (51, 51, 51))])
+        canvas[inside] = shade[inside]
+
+    r = rng.random() * 80 + 20
+    cx, cy = rng.random() * (WIDTH - 2 * r) + r, rng.random() * (HEIGHT - 2 * r) + r
+    d = np.hypot(xx - (cx - 0.3 * r), yy - (cy - 0.3 * r)) / r
+    inside = np.hypot(xx - cx, yy - cy) <= r
+    shade = ramp(d, [(0, (255, 255, 255)), (0.3, (255, 136, 136)), (0.7, (102, 102, 102)), (1, (0, 0, 0))])
+    canvas[inside] = shade[inside]
+    Image.fromarray(canvas.astype(np.uint8)).save(path)
+
+
+def build_corpus(root, count, seed):
+    rng = random.Random(seed)
+    corpora = {}
+    for name, maker in (("circles", make_circles), ("scenes", make_scene)):
+        folder = os.path.join(root, name)
+        os.makedirs(folder, exist_ok=True)
+        for i in range(count):
+            maker(os.path.join(folder, f"{name}-{i:03d}.png"), rng)
+        corpora[name] = folder
+    return corpora
+
+
+# -- measurement -----------------------------------------------------------
+
+def percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return None
+    k = (len(values) - 1) * q / 100
+    lo, hi = int(k), min(int(k) + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def measure(fn, inputs, repeat):
+    """Latencies (ms) over repeat passes of inputs, then peak allocation of one traced pass"""
+    times = []
+    for _ in range(repeat):
+        for item in inputs:
+            start = time.perf_counter()
+            fn(item)
+            times.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    peak = 0
+    for item in inputs:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        fn(item)
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+
+    return {"n": len(times), "p50_ms": percentile(times, 50), "p95_ms": percentile(times, 95),
+            "mean_ms": sum(times) / len(times), "alloc_peak_kb": peak / 1024}
+
+
+def load_script(name):
+    """Import a hyphenated slideshow script as a module"""
+    spec = importlib.util.spec_from_file_location(name.replace("-", "_")[:-3], os.path.join(HERE, name))
+    module = importlib.util.module_from_spec(spec)
+    with contextlib.redirect_stdout(io.StringIO()):
+        spec.loader.exec_module(module)
+    return module
+
+
+class Inputs:
+    """Per-image inputs for each stage, computed outside the timed region"""
+
+    def __init__(self, folder):
+        from PIL import Image
+        from epaper import PackedFrame, convert_to_epaper_layers, list_images, prepare_image
+        self.paths = list_images(folder)
+        self.prepared = [prepare_image(Image.open(p), WIDTH, HEIGHT) for p in self.paths]
+        self.frames = [PackedFrame.from_image(img, WIDTH, HEIGHT, use_alpha=True) for img in self.prepared]
+        self.layers = [convert_to_epaper_layers(img, WIDTH, HEIGHT) for img in self.prepared]
+
+
+def pipeline_stages(inputs, epd):
+    from PIL import Image
+    from epaper import FrameCache, PackedFrame, convert_to_epaper_layers, load_frame, prepare_image, send_planes
+    cache = FrameCache()
+    for path in inputs.paths:
+        load_frame(path, WIDTH, HEIGHT, cache=cache)  # warm the cache
+    master = PackedFrame.blank()
+    idx = range(len(inputs.paths))
+
+    def decode(i):
+        Image.open(inputs.paths[i]).load()
+
+    return [
+        ("decode", decode, idx),
+        ("prepare_image", lambda i: prepare_image(Image.open(inputs.paths[i]), WIDTH, HEIGHT), idx),
+        ("convert_to_epaper_layers", lambda i: convert_to_epaper_layers(inputs.prepared[i], WIDTH, HEIGHT), idx),
+        ("PackedFrame.from_image", lambda i: PackedFrame.from_image(inputs.prepared[i]), idx),
+        ("PackedFrame.from_image (bayer4)", lambda i: PackedFrame.from_image(inputs.prepared[i], dither="bayer4"), idx),
+        ("PackedFrame.from_image (atkinson)", lambda i: PackedFrame.from_image(inputs.prepared[i], dither="atkinson"), idx),
+        ("getbuffer", lambda i: [epd.getbuffer(layer) for layer in inputs.layers[i]], idx),
+        ("overlay", lambda i: master.overlay(inputs.frames[i]), idx),
+        ("load_frame (cache hit)", lambda i: load_frame(inputs.paths[i], WIDTH, HEIGHT, cache=cache), idx),
+        ("spi_send", lambda i: send_planes(epd, inputs.frames[i]), idx),
+    ]
+
+
+def variant_stages(name, module, inputs):
+    """compose, plan, review and send of the script's display strategy, on a simulated panel"""
+    from epaper import STRATEGIES, PackedFrame
+    from epaper.simulator import EPD
+    strategy = STRATEGIES[module.MODE](EPD())
+    strategy.start()
+    frames = [PackedFrame.from_image(img, WIDTH, HEIGHT, use_alpha=strategy.use_alpha) for img in inputs.prepared]
+    targets = [strategy.compose(frame).copy() for frame in frames]
+    plans = [strategy.plan(target, frame) for target, frame in zip(targets, frames)]
+    updates = [strategy.review(plan) for plan in plans]
+    idx = range(len(inputs.paths))
+    return [
+        ("compose", lambda i: strategy.compose(frames[i]), idx),
+        ("plan", lambda i: strategy.plan(targets[i], frames[i]), idx),
+        ("review", lambda i: strategy.review(plans[i]), idx),
+        ("send", lambda i: strategy.send(updates[i]), idx),
+    ]
+
+
+def run_end_to_end(module, folder, frames):
+    """Run the script's main() on the simulated panel for a number of frames"""
+    import epaper.simulator
+    import epaper.state
+    import epaper.watch
+
+    panels = []
+    ticks = []
+
+    class Done(KeyboardInterrupt):
+        pass
+
+    def tick():
+        ticks.append(time.perf_counter())
+        if len(ticks) >= frames:
+            raise Done()
+
+    def fake_wait(self, timeout):
+        if timeout == FRAME_TICK:
+            tick()
+        return False
+
+    original_init = epaper.simulator.EPD.__init__
+
+    def recording_init(self, *args, **kwargs):
+        original_init(self, *args, **kwargs)
+        panels.append(self)
+
+    module.IMG_DIR = folder
+    module.DELAY_SECONDS = FRAME_TICK
+    epaper.simulator.EPD.__init__ = recording_init
+    original_wait = epaper.watch.ImageWatcher.wait
+    epaper.watch.ImageWatcher.wait = fake_wait
+
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            module.main()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        epaper.simulator.EPD.__init__ = original_init
+        epaper.watch.ImageWatcher.wait = original_wait
+        # The next run starts on a fresh simulated panel, not the glass left here
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(os.path.join(epaper.state.DEFAULT_STATE_DIR, epaper.state.STATE_NAME))
+
+    frame_ms = [(b - a) * 1000 for a, b in zip([start] + ticks, ticks)]
+    stats = panels[0].stats if panels else {}
+    shown = max(1, len(ticks))
+    return {"frames": len(ticks), "p50_ms": percentile(frame_ms, 50), "p95_ms": percentile(frame_ms, 95),
+            "panel_s_per_frame": (stats.get("spi_seconds", 0) + stats.get("busy_seconds", 0)) / shown,
+            "spi_bytes_per_frame": stats.get("spi_bytes", 0) / shown,
+            "full_refreshes": stats.get("full_refreshes", 0),
+            "partial_refreshes": stats.get("partial_refreshes", 0)}
+
+
+def run_variant(name, corpora, repeat, frames, out):
+    """Child process entry point: all measurements for one variant"""
+    os.environ["EPAPER_SIMULATOR"] = "1"
+    os.environ["EPAPER_CACHE_DIR"] = tempfile.mkdtemp(prefix="epaper-bench-cache-")
+    os.environ["EPAPER_STATE_DIR"] = tempfile.mkdtemp(prefix="epaper-bench-state-")
+    sys.path.insert(0, HERE)
+    results = {"stages": [], "end_to_end": []}
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            from epaper.simulator import EPD
+            epd = EPD()
+        for corpus, folder in corpora.items():
+            if name in OVERLAY_ONLY and corpus != "circles":
+                continue
+            inputs = Inputs(folder)
+            with contextlib.redirect_stdout(io.StringIO()):
+                if name == PIPELINE:
+                    stages = pipeline_stages(inputs, epd)
+                else:
+                    stages = variant_stages(name, load_script(name), inputs)
+            for stage, fn, items in stages:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    row = measure(fn, items, repeat)
+                results["stages"].append(dict(variant=name, corpus=corpus, stage=stage, **row))
+            if name != PIPELINE:
+                row = run_end_to_end(load_script(name), folder, frames)
+                results["end_to_end"].append(dict(variant=name, corpus=corpus, **row))
+    except Exception as e:
+        results["error"] = f"{type(e).__name__}: {e}"
+    results["peak_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    out.send(results)
+    out.close()
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def fmt(value, digits=1):
+    return "-" if value is None else f"{value:.{digits}f}"
+
+
+def print_report(report):
+    print(f"\n{'variant':30} {'corpus':8} {'stage':28} {'p50 ms':>9} {'p95 ms':>9} {'alloc KB':>9}")
+    for row in report["stages"]:
+        print(f"{row['variant']:30} {row['corpus']:8} {row['stage']:28} "
+              f"{fmt(row['p50_ms'], 2):>9} {fmt(row['p95_ms'], 2):>9} {fmt(row['alloc_peak_kb'], 0):>9}")
+    print(f"\n{'variant':30} {'corpus':8} {'frames':>6} {'p50 ms':>9} {'p95 ms':>9} {'panel s':>8} {'SPI KB':>8}")
+    for row in report["end_to_end"]:
+        print(f"{row['variant']:30} {row['corpus']:8} {row['frames']:>6} {fmt(row['p50_ms']):>9} "
+              f"{fmt(row['p95_ms']):>9} {fmt(row['panel_s_per_frame'], 2):>8} {fmt(row['spi_bytes_per_frame'] / 1024):>8}")
+    print(f"\n{'variant':30} {'peak RSS MB':>11}")
+    for variant, rss in report["peak_rss_kb"].items():
+        print(f"{variant:30} {rss / 1024:>11.1f}")
+    for variant, error in report["errors"].items():
+        print(f"⚠️  {variant}: {error}")
+
+
+def print_comparison(report, previous, threshold=0.10):
+    old = {(r["variant"], r["corpus"], r["stage"]): r for r in previous.get("stages", [])}
+    print(f"\nCompared with {previous.get('commit')} ({previous.get('timestamp')}):")
+    for row in report["stages"]:
+        before = old.get((row["variant"], row["corpus"], row["stage"]))
+        if not before or not before["p50_ms"] or row["p50_ms"] is None:
+            continue
+        change = row["p50_ms"] / before["p50_ms"] - 1
+        flag = "  ⚠️  REGRESSION" if change > threshold else ""
+        print(f"{row['variant']:30} {row['corpus']:8} {row['stage']:28} "
+              f"{before['p50_ms']:9.2f} -> {row['p50_ms']:9.2f} ms ({change:+.0%}){flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the e-paper conversion and display pipeline")
+    parser.add_argument("--variants", help="comma-separated scripts (default: all, plus the shared pipeline)")
+    parser.add_argument("--images", type=int, default=8, help="synthetic images per corpus")
+    parser.add_argument("--repeat", type=int, default=3, help="timed passes over the corpus per stage")
+    parser.add_argument("--frames", type=int, default=12, help="frames per end-to-end run")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="bench-results.json")
+    parser.add_argument("--compare", help="previous results file to compare p50 latencies against")
+    args = parser.parse_args()
+
+    variants = args.variants.split(",") if args.variants else [PIPELINE] + VARIANTS
+    report = {"commit": git_commit(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+              "python": platform.python_version(), "machine": platform.machine(),
+              "config": vars(args), "stages": [], "end_to_end": [], "peak_rss_kb": {}, "errors": {}}
+
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory(prefix="epaper-bench-") as root:
+        corpora = build_corpus(root, args.images, args.seed)
+        for variant in variants:
+            print(f"⏱️  {variant}...")
+            receive, send = context.Pipe(duplex=False)
+            process = context.Process(target=run_variant, args=(variant, corpora, args.repeat, args.frames, send))
+            process.start()
+            results = receive.recv()
+            process.join()
+            report["stages"] += results["stages"]
+            report["end_to_end"] += results["end_to_end"]
+            report["peak_rss_kb"][variant] = results["peak_rss_kb"]
+            if "error" in results:
+                report["errors"][variant] = results["error"]
+
+    print_report(report)
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(report, json.load(f))
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Pre-convert an image folder into a frame deck for the slideshows.
+
+    python3 build-deck.py /home/pi/pics
+"""
+import argparse
+import time
+
+from epaper import DECK_NAME, DITHER_MODES, FrameCache, build_deck
+from epaper.frame import WIDTH, HEIGHT
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a pre-converted frame deck from an image folder")
+    parser.add_argument("folder", help="image folder, e.g. /home/pi/pics")
+    parser.add_argument("-o", "--output", help=f"deck file (default: <folder>/{DECK_NAME})")
+    parser.add_argument("--width", type=int, default=WIDTH)
+    parser.add_argument("--height", type=int, default=HEIGHT)
+    parser.add_argument("--use-alpha", action="store_true", help="treat transparent pixels as white")
+    parser.add_argument("--dither", choices=DITHER_MODES, help="dither gradients instead of thresholding")
+    parser.add_argument("--no-cache", action="store_true", help="do not reuse or fill the frame cache")
+    args = parser.parse_args()
+
+    cache = None if args.no_cache else FrameCache()
+    start = time.time()
+    path, count = build_deck(args.folder, args.output, args.width, args.height, args.use_alpha, cache=cache,
+                              dither=args.dither)
+    print(f"✅ Built {path}: {count} frames in {time.time() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
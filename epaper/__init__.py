@@ -0,0 +1,17 @@
+"""Shared frame pipeline for the e-paper slideshow scripts."""
+from .convert import ALPHA_MIN, content_masks, mask_to_layer, prepare_image, convert_to_epaper_layers
+from .dither import DITHER_MODES, dither_masks, error_diffusion, ordered_dither
+from .palette import build_lut, lab_masks, load_lut
+from .frame import PackedFrame, load_frame
+from .display import SPI_CHUNK, send_buffer, send_planes, refresh, display_frame, display_window, clear
+from .cache import FrameCache
+from .deck import DECK_NAME, FrameDeck, build_deck
+from .images import list_images
+from .regions import align_box, component_boxes, component_circles, frame_ink, frame_regions, merge_boxes
+from .diff import plan_black_first, plan_update, send_windows
+from .state import PanelState
+from .watch import ImageWatcher
+from .policy import UNLIMITED, RefreshPolicy
+from .strategies import STRATEGIES, Strategy
+from .engine import PREFETCH_DEPTH, Slideshow
+from .simulator import load_driver
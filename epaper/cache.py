@@ -0,0 +1,129 @@
+"""
+On-disk cache of converted frames.
+
+Entries are keyed by the source file (path, mtime, size - or its content
+hash) plus the conversion parameters, so a second pass through the deck
+skips decode and conversion entirely. The cache is trimmed least recently
+used first whenever it grows past max_bytes.
+"""
+import hashlib
+import os
+import struct
+
+import numpy as np
+
+from . import convert
+from .frame import PackedFrame
+
+DEFAULT_CACHE_DIR = os.environ.get("EPAPER_CACHE_DIR", os.path.expanduser("~/.cache/epaper-frames"))
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024  # ~680 frames of 96 KB
+
+MAGIC = b"EPF1"
+HEADER = struct.Struct("<4sHH")  # magic, width, height
+SUFFIX = ".frame"
+
+
+def write_frame_file(path, frame):
+    """Atomically write a frame as header + black plane + red plane"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, frame.width, frame.height))
+        f.write(frame.black.tobytes())
+        f.write(frame.red.tobytes())
+    os.replace(tmp, path)
+
+
+def read_frame_file(path):
+    """Read a frame written by write_frame_file, or None if it is unusable"""
+    with open(path, "rb") as f:
+        data = bytearray(os.fstat(f.fileno()).st_size)
+        f.readinto(data)
+    if len(data) < HEADER.size:
+        return None
+    magic, width, height = HEADER.unpack_from(data)
+    plane = width // 8 * height
+    if magic != MAGIC or len(data) != HEADER.size + 2 * plane:
+        return None
+    planes = np.frombuffer(data, np.uint8, offset=HEADER.size).reshape(2, height, width // 8)
+    return PackedFrame(planes[0], planes[1])
+
+
+class FrameCache:
+    """Converted frames on disk, keyed by source file and conversion parameters"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, hash_content=False):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hash_content = hash_content
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, path, **params):
+        """Cache key for a source file converted with the given parameters"""
+        digest = hashlib.sha1()
+        if self.hash_content:
+            with open(path, "rb") as f:
+                digest.update(hashlib.sha1(f.read()).digest())
+        else:
+            st = os.stat(path)
+            digest.update(f"{os.path.abspath(path)}|{st.st_mtime_ns}|{st.st_size}".encode())
+        # Threshold changes must invalidate old entries too
+        params.setdefault("thresholds", (convert.RED_MIN, convert.RED_GB_MAX,
+                                         convert.BLACK_MEAN, convert.ALPHA_MIN))
+        digest.update(repr(sorted(params.items())).encode())
+        return digest.hexdigest()
+
+    def entry_path(self, key):
+        return os.path.join(self.cache_dir, key + SUFFIX)
+
+    def get(self, path, **params):
+        """Cached frame for path, or None"""
+        try:
+            entry = self.entry_path(self.key(path, **params))
+            frame = read_frame_file(entry)
+        except OSError:
+            frame = None
+        if frame is None:
+            self.misses += 1
+            return None
+        try:
+            os.utime(entry)  # mark as recently used
+        except OSError:
+            pass
+        self.hits += 1
+        return frame
+
+    def put(self, path, frame, **params):
+        """Store a converted frame for path, then trim the cache"""
+        try:
+            write_frame_file(self.entry_path(self.key(path, **params)), frame)
+        except OSError as e:
+            print(f"Frame cache write failed: {e}")
+            return
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits max_bytes"""
+        entries = []
+        total = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(SUFFIX):
+                    st = entry.stat()
+                    entries.append((st.st_mtime_ns, st.st_size, entry.path))
+                    total += st.st_size
+        entries.sort()
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(entry)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(SUFFIX):
+                os.remove(os.path.join(self.cache_dir, name))
@@ -0,0 +1,99 @@
+"""
+Vectorized conversion of full-colour frames into the panel's two 1-bit layers.
+
+Same rules every slideshow script has always used, evaluated on whole
+NumPy arrays instead of 384,000 Python-level pixel lookups:
+- red:   r > 150 and g < 80 and b < 80
+- black: (r + g + b) / 3 < 100  (and not red)
+- everything else stays white
+
+With a dither mode (see dither.py) gradients are stippled across the
+three inks instead of being cut at these thresholds.
+"""
+import numpy as np
+from PIL import Image
+
+from .dither import dither_masks
+
+RED_MIN = 150      # R must be above this to count as red
+RED_GB_MAX = 80    # ... with G and B both below this
+BLACK_MEAN = 100   # mean of R, G, B below this is black
+ALPHA_MIN = 128    # alpha below this is treated as transparent
+
+RESAMPLE = Image.Resampling.BICUBIC  # filter for the final resize in prepare_image
+REDUCING_GAP = 3.0  # reduce() by whole factors while the source is 3x the target or more
+
+
+def content_masks(img, use_alpha=False, dither=None):
+    """
+    Return (black, red) boolean arrays of shape (height, width).
+    True means the pixel gets ink on that layer. Red wins over black.
+    With use_alpha, transparent pixels (alpha < 128) get no ink at all.
+    dither names a mode from dither.DITHER_MODES; None thresholds.
+    """
+    opaque = None
+    if use_alpha and img.mode != "RGB" and img.has_transparency_data:
+        rgba = np.asarray(img.convert("RGBA"))
+        rgb = rgba[..., :3]
+        opaque = rgba[..., 3] >= ALPHA_MIN
+    else:
+        rgb = np.asarray(img if img.mode == "RGB" else img.convert("RGB"))
+
+    if dither:
+        black, red = dither_masks(rgb, dither)
+    else:
+        r = rgb[..., 0]
+        g = rgb[..., 1]
+        b = rgb[..., 2]
+
+        red = (r > RED_MIN) & (g < RED_GB_MAX) & (b < RED_GB_MAX)
+        # (r + g + b) / 3 < 100 is exactly r + g + b < 300 for integers
+        total = r.astype(np.uint16) + g + b
+        black = (total < 3 * BLACK_MEAN) & ~red
+
+    if opaque is not None:
+        red &= opaque
+        black &= opaque
+
+    return black, red
+
+
+def mask_to_layer(mask):
+    """Turn an ink mask into a PIL "1" layer (0 = ink, 255 = white)"""
+    height, width = mask.shape
+    packed = np.packbits(~mask, axis=1)
+    return Image.frombytes("1", (width, height), packed.tobytes())
+
+
+def prepare_image(img, width, height, resample=RESAMPLE):
+    """
+    Prepare image: rotate if portrait, resize.
+    Done in the order that touches the fewest pixels: a JPEG not yet loaded
+    is decoded at the smallest DCT scale still covering the target, the
+    resize works in the source orientation (shrinking by whole factors with
+    reduce() first when the source is much larger), and the rotation is a
+    lossless transpose of the already small image. resample picks the
+    quality of the final resize.
+    """
+    portrait = img.height > img.width
+    size = (height, width) if portrait else (width, height)
+    img.draft(img.mode, size)
+    if img.size != size:
+        img = img.resize(size, resample, reducing_gap=REDUCING_GAP)
+    if portrait:
+        img = img.transpose(Image.Transpose.ROTATE_270)
+    return img
+
+
+def convert_to_epaper_layers(img, width, height, use_alpha=False, dither=None):
+    """
+    Convert full-color image into two 1-bit layers:
+    - black layer
+    - red layer
+    All others become white.
+    """
+    if img.size != (width, height):
+        img = img.resize((width, height))
+
+    black, red = content_masks(img, use_alpha=use_alpha, dither=dither)
+    return mask_to_layer(black), mask_to_layer(red)
@@ -0,0 +1,154 @@
+"""
+Pre-built deck of converted frames, memory-mapped by the slideshow.
+
+A deck file holds every image of a folder already converted to packed
+black/red planes:
+
+    header   magic, version, width, height, use_alpha, frame count,
+             index offset and size, dither mode, padded to 4 KB
+    frames   black plane + red plane per image, back to back
+    index    JSON list of [file name, mtime_ns, size], one per frame
+
+Frames are sliced zero-copy out of the mapping. Entries whose source file
+changed since the build are ignored, so the caller falls back to live
+conversion for new or edited images.
+
+Build on a workstation or on the Pi with build-deck.py.
+"""
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from .frame import WIDTH, HEIGHT, PackedFrame, load_frame
+from .images import list_images
+
+DECK_NAME = "frames.deck"
+MAGIC = b"EPDK"
+VERSION = 2
+HEADER = struct.Struct("<4sHHHHIQI")  # magic, version, width, height, use_alpha, count, index offset, index size
+DITHER = struct.Struct("16s")         # after HEADER since version 2; empty for thresholded frames
+ALIGN = 4096
+
+
+class FrameDeck:
+    """Read-only view of a deck file; missing or invalid files behave as an empty deck"""
+
+    def __init__(self, path):
+        self.path = path
+        self.index = {}
+        self.width = self.height = 0
+        self.use_alpha = False
+        self.dither = None
+        self._map = None
+        self._stat = None
+        self.reload()
+
+    def reload(self):
+        """(Re)map the deck if the file was created or replaced since the last load"""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            self.close()
+            return False
+        if self._stat == (st.st_ino, st.st_mtime_ns, st.st_size):
+            return False
+
+        self.close()
+        self._stat = (st.st_ino, st.st_mtime_ns, st.st_size)
+        try:
+            with open(self.path, "rb") as f:
+                deck_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            print(f"Could not map deck {self.path}: {e}")
+            return False
+
+        try:
+            magic, version, width, height, use_alpha, count, index_offset, index_size = HEADER.unpack_from(deck_map)
+            if magic != MAGIC or version not in (1, VERSION):
+                print(f"Ignoring deck with unknown format: {self.path}")
+                deck_map.close()
+                return False
+
+            entries = json.loads(deck_map[index_offset:index_offset + index_size])
+            frame_size = 2 * (width // 8) * height
+            index = {name: (mtime_ns, size, ALIGN + i * frame_size)
+                     for i, (name, mtime_ns, size) in enumerate(entries)}
+            dither = None
+            if version > 1:
+                dither = DITHER.unpack_from(deck_map, HEADER.size)[0].rstrip(b"\0").decode() or None
+        except (struct.error, TypeError, ValueError) as e:  # ValueError covers JSON and UTF-8 decode errors
+            print(f"Ignoring damaged deck {self.path}: {e}")
+            deck_map.close()
+            return False
+
+        self.index = index
+        self.width, self.height, self.use_alpha = width, height, bool(use_alpha)
+        self.dither = dither
+        self._map = deck_map
+        print(f"🗂️  Mapped deck with {count} frames: {self.path}")
+        return True
+
+    def get(self, path, width=WIDTH, height=HEIGHT, use_alpha=False, dither=None):
+        """Frame for an image file, or None if it is not (or no longer) in the deck"""
+        if self._map is None or (width, height, use_alpha, dither) != (self.width, self.height, self.use_alpha, self.dither):
+            return None
+        entry = self.index.get(os.path.basename(path))
+        if entry is None:
+            return None
+        mtime_ns, size, offset = entry
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if (st.st_mtime_ns, st.st_size) != (mtime_ns, size):
+            return None
+
+        shape = (height, width // 8)
+        planes = np.frombuffer(self._map, np.uint8, count=2 * shape[0] * shape[1], offset=offset)
+        planes = planes.reshape(2, *shape)
+        return PackedFrame(planes[0], planes[1])
+
+    def __len__(self):
+        return len(self.index)
+
+    def close(self):
+        self.index = {}
+        self._stat = None
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                pass  # frames still reference the old mapping; it goes with them
+            self._map = None
+
+
+def build_deck(folder, deck_path=None, width=WIDTH, height=HEIGHT, use_alpha=False, cache=None, dither=None):
+    """Convert every image in folder into a deck file, streamed and written atomically"""
+    deck_path = deck_path or os.path.join(folder, DECK_NAME)
+    entries = []
+    tmp = f"{deck_path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(b"\0" * ALIGN)  # header is filled in once the index is known
+        for path in list_images(folder):
+            try:
+                st = os.stat(path)
+                frame = load_frame(path, width, height, use_alpha=use_alpha, cache=cache, dither=dither)
+            except Exception as e:
+                print(f"Skipping {path}: {e}")
+                continue
+            f.write(frame.black.tobytes())
+            f.write(frame.red.tobytes())
+            entries.append([os.path.basename(path), st.st_mtime_ns, st.st_size])
+
+        index = json.dumps(entries).encode()
+        index_offset = f.tell()
+        f.write(index)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, width, height, int(use_alpha),
+                            len(entries), index_offset, len(index)))
+        f.write(DITHER.pack((dither or "").encode()))
+    os.replace(tmp, deck_path)
+    return deck_path, len(entries)
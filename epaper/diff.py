@@ -0,0 +1,147 @@
+"""
+Send each frame as the cheapest update from the frame already on the panel.
+
+The new planes are XORed against the last frame sent. Identical frames are
+skipped. Otherwise the changed bytes of either plane are grouped into
+windows (connected components of the dirty byte mask, merged where one
+refresh is cheaper than two) and each window is sent on its own, unless a
+full display is cheaper under the panel timing model. A window with no red
+ink before or after is sent with display_Partial on the fast black/white
+waveform, and its red plane is not sent at all; a window with red needs
+both planes and the tri-colour waveform (display_window), which
+display_Partial would wash the red out of.
+
+That waveform is the slow part, so when the red plane is unchanged only
+black is diffed, and a small red change can be held back
+(plan_black_first): the frame goes out black/white only and the red
+follows with a later tri-colour refresh.
+"""
+import contextlib
+
+import numpy as np
+
+from .display import display_window
+from .frame import PackedFrame
+from .regions import MAX_COMPONENTS, component_boxes, merge_boxes
+from .timing import BW_REFRESH_S, FULL_REFRESH_S, MIN_WINDOW_FRACTION, SPI_HZ
+
+RED_DEFER_BYTES = 480  # red plane bytes (1%) a frame may change and have held back
+
+
+def full_seconds(frame):
+    """Modelled time of a full display: both planes plus the tri-colour waveform"""
+    return frame.nbytes * 8 / SPI_HZ + FULL_REFRESH_S
+
+
+def red_inside(frame, box):
+    """Whether a frame has red ink inside a window"""
+    x0, y0, x1, y1 = box
+    return bool((frame.red[y0:y1, x0 // 8:x1 // 8] != 0xFF).any())
+
+
+def partial_seconds(frame, boxes, last=None):
+    """
+    Modelled time of one windowed refresh per box: display_Partial, or
+    display_window where last or frame has red inside.
+    """
+    seconds = 0.0
+    for box in boxes:
+        x0, y0, x1, y1 = box
+        area = (x1 - x0) * (y1 - y0) / (frame.width * frame.height)
+        red = red_inside(frame, box) or (last is not None and red_inside(last, box))
+        seconds += (x1 - x0) // 8 * (y1 - y0) * (16 if red else 8) / SPI_HZ
+        seconds += (FULL_REFRESH_S if red else BW_REFRESH_S) * (MIN_WINDOW_FRACTION + (1 - MIN_WINDOW_FRACTION) * area)
+    return seconds
+
+
+@contextlib.contextmanager
+def panel_mode(epd, bw, partial_mode):
+    """
+    Run a block with the panel in init_part() mode (bw) or init() mode,
+    switching from and back to the mode it is kept in - init_part() when
+    partial_mode is set.
+    """
+    switch = bw != partial_mode
+    if switch:
+        epd.init_part() if bw else epd.init()
+    yield
+    if switch:
+        epd.init() if bw else epd.init_part()
+
+
+def send_windows(epd, last, windows, partial_mode=False):
+    """
+    Send (box, window frame) pairs to the panel showing last: black/white
+    windows in init_part() mode with display_Partial, then the windows with
+    red on either side in init() mode with display_window. partial_mode
+    says the panel is kept in init_part() mode. Returns the boxes sent with
+    red.
+    """
+    red = {box for box, window in windows if red_inside(last, box) or (window.red != 0xFF).any()}
+    if len(red) < len(windows):
+        with panel_mode(epd, True, partial_mode):
+            for box, window in windows:
+                if box not in red:
+                    epd.display_Partial(window.buffers()[0], *box)
+    if red:
+        with panel_mode(epd, False, partial_mode):
+            for box, window in windows:
+                if box in red:
+                    display_window(epd, window, *box)
+    return red
+
+
+def dirty_boxes(last, frame, red=True):
+    """
+    8-pixel-aligned windows covering every byte that differs between two
+    frames - in either plane, or with red False (red known unchanged) black only.
+    """
+    dirty = np.bitwise_xor(last.black, frame.black)
+    if red:
+        dirty |= np.bitwise_xor(last.red, frame.red)
+    dirty = dirty != 0
+    rows = np.flatnonzero(dirty.any(axis=1))
+    if not len(rows):
+        return []
+    boxes = component_boxes(dirty)
+    if len(boxes) > MAX_COMPONENTS:
+        cols = np.flatnonzero(dirty.any(axis=0))
+        boxes = [(cols[0], rows[0], cols[-1] + 1, rows[-1] + 1)]
+    return merge_boxes([(c0 * 8, y0, c1 * 8, y1) for c0, y0, c1, y1 in boxes], frame.width, frame.height)
+
+
+def plan_update(last, frame):
+    """
+    ("skip", []), ("partial", boxes) or ("full", None) to turn the panel
+    showing last into frame. With last None (panel contents unknown) it is
+    always a full display.
+    """
+    if last is None or last.size != frame.size:
+        return "full", None
+    same_red = np.array_equal(last.red, frame.red)
+    if same_red and np.array_equal(last.black, frame.black):
+        return "skip", []
+    boxes = dirty_boxes(last, frame, red=not same_red)
+    if partial_seconds(frame, boxes, last) < full_seconds(frame):
+        return "partial", boxes
+    return "full", None
+
+
+def plan_black_first(last, frame, max_red=RED_DEFER_BYTES):
+    """
+    (kind, boxes, shown): plan_update towards shown, which is frame with a
+    red change of at most max_red plane bytes held back - last's red plane
+    kept - when the rest of the update can then go out on the black/white
+    waveform alone. Otherwise shown is frame itself. A held-back change is
+    still a difference between the glass and the next frame, so it goes out
+    with the next update that pays for the tri-colour waveform anyway.
+    """
+    if last is not None and last.size == frame.size:
+        changed = np.count_nonzero(last.red != frame.red)
+        if 0 < changed <= max_red:
+            shown = PackedFrame(frame.black, last.red)
+            kind, boxes = plan_update(last, shown)
+            if kind == "skip" or (kind == "partial" and not any(red_inside(last, box) for box in boxes)):
+                return kind, boxes, shown
+    return plan_update(last, frame) + (frame,)
+
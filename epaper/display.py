@@ -0,0 +1,96 @@
+"""
+Low-level transfers of packed frames to the 7.5" (B) V2 panel.
+
+Works on any waveshare_epd.epd7in5b_V2.EPD (or subclass): only the
+send_command/send_data2/ReadBusy primitives of the driver are used.
+Panel RAM convention: 0x10 plane is 1 = white, 0x13 plane is 1 = red.
+"""
+import time
+
+import numpy as np
+
+SPIDEV_BUFSIZ = "/sys/module/spidev/parameters/bufsiz"
+
+
+def spidev_bufsiz(default=4096):
+    """Largest single transfer the spidev driver accepts (its bufsiz parameter)"""
+    try:
+        with open(SPIDEV_BUFSIZ) as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        return default
+
+
+SPI_CHUNK = spidev_bufsiz()
+
+_white_planes = {}
+
+
+def send_buffer(epd, data, chunk_size=None):
+    """
+    Write a byte buffer with a handful of send_data2 transfers of at most
+    chunk_size bytes each, without copying it into a Python list.
+    """
+    chunk_size = chunk_size or SPI_CHUNK
+    view = memoryview(data).cast("B")
+    for start in range(0, len(view), chunk_size):
+        epd.send_data2(view[start:start + chunk_size])
+
+
+def send_planes(epd, frame, chunk_size=None):
+    """Write both planes of a PackedFrame to panel RAM without refreshing"""
+    epd.send_command(0x10)  # DATA START TRANSMISSION 1 (black)
+    send_buffer(epd, np.ascontiguousarray(frame.black), chunk_size)
+
+    epd.send_command(0x13)  # DATA START TRANSMISSION 2 (red)
+    send_buffer(epd, np.invert(frame.red), chunk_size)
+
+
+def refresh(epd):
+    """Trigger a display refresh and wait for the panel"""
+    epd.send_command(0x12)  # DISPLAY REFRESH
+    time.sleep(0.1)
+    epd.ReadBusy()
+
+
+def display_window(epd, window, x0, y0, x1, y1, chunk_size=None):
+    """
+    Send a window cut from a PackedFrame (both planes) and refresh only that
+    window with the tri-colour waveform, so it can show red - unlike
+    display_Partial. x0/x1 on byte boundaries; the panel must be in init()
+    mode, not init_part().
+    """
+    epd.send_command(0x91)  # PARTIAL IN
+    epd.send_command(0x90)  # PARTIAL WINDOW
+    for value in (x0, x1 - 1, y0, y1 - 1):
+        epd.send_data(value >> 8)
+        epd.send_data(value & 0xFF)
+    epd.send_data(0x01)  # scan inside the window only
+    send_planes(epd, window, chunk_size)
+    refresh(epd)
+    epd.send_command(0x92)  # PARTIAL OUT
+
+
+def display_frame(epd, frame, chunk_size=None):
+    """Send a PackedFrame and refresh - same result as epd.display(...)"""
+    send_planes(epd, frame, chunk_size)
+    refresh(epd)
+
+
+def white_planes(width, height):
+    """Preallocated raw (black, red) RAM contents of an all-white panel"""
+    key = (width, height)
+    if key not in _white_planes:
+        size = width // 8 * height
+        _white_planes[key] = (b"\xff" * size, b"\x00" * size)
+    return _white_planes[key]
+
+
+def clear(epd, chunk_size=None):
+    """Full white clear in bulk transfers - same result as epd.Clear()"""
+    black, red = white_planes(epd.width, epd.height)
+    epd.send_command(0x10)
+    send_buffer(epd, black, chunk_size)
+    epd.send_command(0x13)
+    send_buffer(epd, red, chunk_size)
+    refresh(epd)
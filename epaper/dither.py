@@ -0,0 +1,173 @@
+"""
+Dithering onto the panel's black/white/red palette.
+
+Each pixel is first split into palette weights: white is what green and
+blue share (black and red both have none), red is what the red channel
+has on top of that, black is the rest. A dither then picks one ink per
+pixel so that, over an area, the inks appear in those proportions.
+
+Ordered dithering compares the weights against a tiled Bayer threshold
+matrix - black if t < black, red if t < black + red, else white - as a
+handful of whole-array operations.
+
+Error diffusion picks the nearest ink and pushes the difference onto
+neighbours not yet visited. Along a row that is inherently sequential,
+but with kernels that only reach right and down, every pixel on an
+anti-diagonal x + 2y = k depends only on earlier diagonals - so the image
+is processed as ~1,800 vectorized diagonals instead of 384,000 pixels,
+with exactly the raster-order result. Serpentine scanning alternates
+direction per band of rows: flipping every row would make each row wait
+for the whole previous one, leaving nothing to vectorize. The sweeps
+measure error in (red, green/blue mean) - the two axes the inks differ
+on. Plain Floyd-Steinberg uses Pillow's C palette quantizer instead, ten
+times faster but with plain RGB distance, so it can pick a different ink
+near the palette boundaries than its serpentine variant would.
+
+"lab" does not dither: it maps each pixel to its perceptually nearest ink
+through the lookup table in palette.py.
+"""
+import functools
+
+import numpy as np
+from PIL import Image
+
+from .palette import lab_masks
+
+BAYER_SIZES = {"bayer2": 2, "bayer4": 4, "bayer8": 8}
+
+# ((dy, dx), weight) taps, for a left-to-right scan
+KERNELS = {
+    "floyd-steinberg": (((0, 1), 7 / 16), ((1, -1), 3 / 16), ((1, 0), 5 / 16), ((1, 1), 1 / 16)),
+    "atkinson": (((0, 1), 1 / 8), ((0, 2), 1 / 8), ((1, -1), 1 / 8), ((1, 0), 1 / 8),
+                 ((1, 1), 1 / 8), ((2, 0), 1 / 8)),
+    "sierra-lite": (((0, 1), 2 / 4), ((1, -1), 1 / 4), ((1, 0), 1 / 4)),
+}
+SERPENTINE_BAND = 48  # rows scanned in one direction before turning
+DIFFUSION_MODES = tuple(KERNELS) + tuple(f"{name}-serpentine" for name in KERNELS)
+DITHER_MODES = tuple(BAYER_SIZES) + DIFFUSION_MODES + ("lab",)
+
+# Inks as (r, m) with m = (g + b) / 2: green and blue are equal on every
+# ink, so distances to the palette - and the error - only need r and m.
+INKS = np.array([[255, 255], [0, 0], [255, 0]], np.float32)  # white, black, red
+
+
+def bayer_matrix(size):
+    """size x size Bayer index matrix (size a power of two)"""
+    matrix = np.zeros((1, 1), np.intp)
+    while len(matrix) < size:
+        matrix = np.block([[4 * matrix, 4 * matrix + 2],
+                           [4 * matrix + 3, 4 * matrix + 1]])
+    return matrix
+
+
+@functools.lru_cache(maxsize=8)
+def bayer_thresholds(size, width, height):
+    """Bayer thresholds on a 0..510 scale, tiled over a width x height frame"""
+    matrix = ((2 * bayer_matrix(size) + 1) * 255) // (size * size)
+    reps = (-(-height // size), -(-width // size))
+    thresholds = np.tile(matrix.astype(np.uint16), reps)[:height, :width]
+    thresholds.flags.writeable = False
+    return thresholds
+
+
+def ordered_dither(rgb, size=4):
+    """
+    (black, red) ink masks for an (h, w, 3) uint8 array, Bayer-dithered.
+    Integer form of the weights, doubled: white + red is max(2r, g + b)
+    and white is g + b, out of 510.
+    """
+    r = rgb[..., 0].astype(np.uint16)
+    gb = rgb[..., 1].astype(np.uint16) + rgb[..., 2]
+    t = bayer_thresholds(size, rgb.shape[1], rgb.shape[0])
+    black = np.maximum(r + r, gb) + t < 510  # t < black weight
+    red = ~black & (gb + t < 510)            # t < black + red weight
+    return black, red
+
+
+@functools.lru_cache(maxsize=1)
+def palette_image():
+    """P image holding the three inks, in INKS order, for Image.quantize"""
+    palette = Image.new("P", (1, 1))
+    palette.putpalette([255, 255, 255, 0, 0, 0, 255, 0, 0])
+    return palette
+
+
+@functools.lru_cache(maxsize=4)
+def diffusion_plan(width, height, kernel, band):
+    """
+    Visiting order for error diffusion, grouped into steps of independent
+    pixels, and for every tap the position in that order of the pixel it
+    pulls error from (n, an always-zero slot, where there is none).
+    Bands of rows alternate direction; band=height is a plain raster scan.
+    """
+    n = width * height
+    y, x = np.divmod(np.arange(n), width)
+    direction = np.where(np.arange(height) // band % 2, -1, 1)
+    ahead = np.where(direction[y] > 0, x, width - 1 - x)
+    step = y // band * (width + 2 * band) + ahead + 2 * (y % band)
+    order = np.argsort(step, kind="stable")
+    _, counts = np.unique(step, return_counts=True)
+    bounds = np.concatenate([[0], np.cumsum(counts)]).tolist()
+
+    rank = np.empty(n + 1, np.int32)
+    rank[order] = np.arange(n)
+    rank[n] = n
+    oy, ox = y[order], x[order]
+    sources = []
+    for (dy, dx), weight in KERNELS[kernel]:
+        sy = oy - dy
+        sx = ox - dx * direction[np.maximum(sy, 0)]
+        valid = (sy >= 0) & (sx >= 0) & (sx < width)
+        sources.append((rank[np.where(valid, sy * width + sx, n)], np.float32(weight)))
+    return bounds, order, sources
+
+
+def error_diffusion(rgb, kernel="floyd-steinberg", serpentine=False):
+    """
+    (black, red) ink masks for an (h, w, 3) uint8 array, error-diffused.
+    Plain floyd-steinberg goes through Pillow's quantizer (RGB distance),
+    everything else through the (red, green/blue mean) sweep.
+    """
+    height, width = rgb.shape[:2]
+    if kernel == "floyd-steinberg" and not serpentine:
+        ink = np.asarray(Image.fromarray(rgb).quantize(palette=palette_image(), dither=Image.Dither.FLOYDSTEINBERG))
+        return ink == 1, ink == 2
+
+    n = width * height
+    bounds, order, sources = diffusion_plan(width, height, kernel, SERPENTINE_BAND if serpentine else height)
+    flat = rgb.reshape(n, 3)[order]
+    value = np.empty((n, 2), np.float32)
+    value[:, 0] = flat[:, 0]
+    value[:, 1] = (flat[:, 1].astype(np.float32) + flat[:, 2]) * 0.5
+    error = np.zeros((n + 1, 2), np.float32)
+    ink = np.empty(n, np.uint8)
+
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        v = value[start:end]
+        for source, weight in sources:
+            v += weight * error[source[start:end]]
+        r, m = v[:, 0], v[:, 1]
+        # Nearest ink: black beats white below r + 2m = 382.5, red beats
+        # black above r = 127.5 and white below m = 127.5
+        dark = r + 2 * m < 382.5
+        red = np.where(dark, r > 127.5, m < 127.5)
+        black = dark & ~red
+        ink[start:end] = black + 2 * red
+        error[start:end] = v - INKS[ink[start:end]]
+
+    out = np.empty(n, np.uint8)
+    out[order] = ink
+    out = out.reshape(height, width)
+    return out == 1, out == 2
+
+
+def dither_masks(rgb, mode):
+    """(black, red) ink masks for rgb using one of DITHER_MODES"""
+    if mode in BAYER_SIZES:
+        return ordered_dither(rgb, BAYER_SIZES[mode])
+    if mode == "lab":
+        return lab_masks(rgb)
+    if mode in DIFFUSION_MODES:
+        kernel = mode.removesuffix("-serpentine")
+        return error_diffusion(rgb, kernel, serpentine=kernel != mode)
+    raise ValueError(f"unknown dither mode {mode!r}, expected one of {', '.join(DITHER_MODES)}")
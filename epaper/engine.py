@@ -0,0 +1,133 @@
+"""
+The slideshow loop behind every display script.
+
+Each frame goes source -> prepare -> convert -> composite -> region plan ->
+policy review -> transmit. Paths come from an ImageWatcher over the folder.
+Frames come from the deck, the frame cache or a live conversion
+(load_frame), up to PREFETCH_DEPTH frames ahead on a worker thread - or a
+worker process, so the GIL-bound parts of a conversion do not hold up
+SPI - and conversion overlaps the panel refresh. The strategy (strategies.py) composes and plans the
+update, the refresh policy (policy.py) may turn it into a cleanup of the
+worn tiles, a full display or a clear, and it is sent. What is on the
+glass is kept in the panel state, so a restart can skip its clear.
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from .cache import FrameCache
+from .deck import DECK_NAME, FrameDeck
+from .frame import load_frame
+from .state import PanelState
+from .strategies import STRATEGIES
+from .watch import ImageWatcher
+
+PREFETCH_DEPTH = 2  # frames loaded ahead of the one on the glass
+
+_worker = {}  # FrameCache and FrameDeck of a prefetch process
+
+
+def _init_worker(folder):
+    _worker["cache"] = FrameCache()
+    _worker["deck"] = FrameDeck(os.path.join(folder, DECK_NAME))
+
+
+def _load_in_worker(path, width, height, use_alpha, dither):
+    """Slideshow.load, in a prefetch process with its own cache and deck mapping"""
+    deck = _worker["deck"]
+    deck.reload()
+    return load_frame(path, width, height, use_alpha=use_alpha, cache=_worker["cache"], deck=deck,
+                      dither=dither)
+
+
+class Slideshow:
+    """
+    Show the images in folder with one of STRATEGIES, delay seconds apart.
+    budget overrides the strategy's ghosting budget (policy.DEFAULT_BUDGET);
+    policy.UNLIMITED sends every update as planned. prefetch frames are
+    loaded ahead, in a worker process with processes=True.
+    """
+
+    def __init__(self, epd, mode, folder, delay, owner, dither=None, idle=5, budget=None,
+                 prefetch=PREFETCH_DEPTH, processes=False):
+        self.epd = epd
+        self.strategy = STRATEGIES[mode](epd, budget)
+        self.folder = folder
+        self.delay = delay
+        self.idle = idle
+        self.dither = dither
+        self.prefetch = max(1, prefetch)
+        self.processes = processes
+        self.state = PanelState(owner)
+        self.cache = FrameCache()
+        self.deck = FrameDeck(os.path.join(folder, DECK_NAME))
+
+    def load(self, path):
+        """source -> prepare -> convert, on the prefetch thread"""
+        self.deck.reload()  # pick up a rebuilt deck
+        return load_frame(path, self.epd.width, self.epd.height, use_alpha=self.strategy.use_alpha,
+                          cache=self.cache, deck=self.deck, dither=self.dither)
+
+    def submit(self, pool, path):
+        """Start loading path on the prefetch worker"""
+        if self.processes:
+            return pool.submit(_load_in_worker, path, self.epd.width, self.epd.height,
+                               self.strategy.use_alpha, self.dither)
+        return pool.submit(self.load, path)
+
+    def pool(self):
+        """One prefetch worker - a thread, or a process with processes=True"""
+        if self.processes:
+            return ProcessPoolExecutor(max_workers=1, initializer=_init_worker, initargs=(self.folder,))
+        return ThreadPoolExecutor(max_workers=1, thread_name_prefix="frame-prefetch")
+
+    def show(self, path, frame):
+        """composite -> region plan -> policy review -> transmit"""
+        strategy = self.strategy
+        target = strategy.compose(frame)
+        update = strategy.review(strategy.plan(target, frame))
+        if update[0] != "skip":
+            self.state.forget()  # the glass is changing
+        kind = strategy.send(update)
+        if kind != "skip":
+            self.state.save(strategy.glass, strategy.count, strategy.master)
+        windows = f", {len(update[2])} windows" if kind in ("partial", "cleanup") else ""
+        print(f"🖼️  {os.path.basename(path)}: {kind} update{windows}")
+        return kind
+
+    def run(self):
+        restored = self.state.load(self.epd.width, self.epd.height)
+        if restored:
+            print("♻️  Glass still shows the last frame - skipping the clear")
+        self.strategy.start(restored)
+
+        watcher = ImageWatcher(self.folder)  # inotify-backed image index
+        paths = watcher.cycle(idle=self.idle)
+        try:
+            with self.pool() as pool:
+                pending = deque()
+                while True:
+                    while len(pending) <= self.prefetch:  # converted while the panel refreshes
+                        path = next(paths)
+                        pending.append((path, self.submit(pool, path)))
+                    current, loading = pending.popleft()
+                    try:
+                        self.show(current, loading.result())
+                    except Exception as e:
+                        print(f"Error with {current}: {e}")
+                        continue
+                    if watcher.wait(self.delay):  # returns early when a new image lands
+                        # Show the new image first; the ones loaded ahead follow it
+                        for path, loading in pending:
+                            loading.cancel()
+                            watcher.requeue(path)
+                        pending.clear()
+        except KeyboardInterrupt:
+            print("\n🛑 Slideshow stopped")
+        finally:
+            watcher.close()
+            print(f"Updates: {self.strategy.counts}")
+            try:
+                self.epd.sleep()
+            except Exception:
+                pass
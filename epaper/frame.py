@@ -0,0 +1,132 @@
+"""
+Packed black/red frame planes.
+
+Each plane is a (height, width // 8) uint8 array, 8 pixels per byte with the
+leftmost pixel in the high bit - the same layout as a PIL "1" image and as
+the panel RAM. Bits follow the PIL convention: 1 = white, 0 = ink.
+An 800x480 frame is two 48,000 byte planes.
+"""
+import numpy as np
+from PIL import Image
+
+from .convert import RESAMPLE, content_masks, prepare_image
+
+WIDTH, HEIGHT = 800, 480
+
+
+class PackedFrame:
+    """Black and red planes of one frame, ready to be sent to the panel"""
+
+    def __init__(self, black, red):
+        if black.shape != red.shape or black.dtype != np.uint8:
+            raise ValueError("black and red planes must be uint8 arrays of the same shape")
+        self.black = black
+        self.red = red
+
+    @property
+    def width(self):
+        return self.black.shape[1] * 8
+
+    @property
+    def height(self):
+        return self.black.shape[0]
+
+    @property
+    def size(self):
+        return (self.width, self.height)
+
+    @property
+    def nbytes(self):
+        return self.black.nbytes + self.red.nbytes
+
+    @classmethod
+    def blank(cls, width=WIDTH, height=HEIGHT):
+        """All-white frame"""
+        shape = (height, width // 8)
+        return cls(np.full(shape, 0xFF, np.uint8), np.full(shape, 0xFF, np.uint8))
+
+    @classmethod
+    def from_masks(cls, black, red):
+        """Pack boolean ink masks (True = ink) into planes"""
+        if black.shape[1] % 8:
+            raise ValueError("frame width must be a multiple of 8")
+        return cls(np.packbits(~black, axis=1), np.packbits(~red, axis=1))
+
+    @classmethod
+    def from_image(cls, img, width=WIDTH, height=HEIGHT, use_alpha=False, dither=None):
+        """Convert a full-colour image straight to packed planes"""
+        if img.size != (width, height):
+            img = img.resize((width, height))
+        return cls.from_masks(*content_masks(img, use_alpha=use_alpha, dither=dither))
+
+    def to_layers(self):
+        """Unpack into two PIL "1" layers (black, red)"""
+        return (Image.frombytes("1", self.size, self.black.tobytes()),
+                Image.frombytes("1", self.size, self.red.tobytes()))
+
+    def buffers(self):
+        """
+        Planes in the format epd.getbuffer() returns (1 = ink), for the
+        driver's display(). display() inverts the black buffer in place,
+        so fresh bytearrays are returned on every call.
+        """
+        return bytearray(~self.black), bytearray(~self.red)
+
+    def copy(self):
+        return PackedFrame(self.black.copy(), self.red.copy())
+
+    def crop(self, x_start, y_start, x_end, y_end):
+        """Copy of a window, with x widened to 8-pixel byte boundaries"""
+        col_start = x_start // 8
+        col_end = (x_end + 7) // 8
+        return PackedFrame(self.black[y_start:y_end, col_start:col_end].copy(),
+                           self.red[y_start:y_end, col_start:col_end].copy())
+
+    def overlay(self, other, red_over_black=True):
+        """
+        Accumulate another frame onto this one, in place.
+        Ink is 0, so adding ink is a bitwise AND of the planes. With
+        red_over_black a red pixel clears black at the same position.
+        """
+        np.bitwise_and(self.black, other.black, out=self.black)
+        np.bitwise_and(self.red, other.red, out=self.red)
+        if red_over_black:
+            np.bitwise_or(self.black, ~self.red, out=self.black)
+        return self
+
+    def __eq__(self, other):
+        if not isinstance(other, PackedFrame):
+            return NotImplemented
+        return (np.array_equal(self.black, other.black)
+                and np.array_equal(self.red, other.red))
+
+
+def load_frame(path, width=WIDTH, height=HEIGHT, use_alpha=False, cache=None, deck=None, dither=None,
+               resample=None):
+    """
+    Open, prepare and convert an image file. A FrameDeck and a FrameCache,
+    if given, are tried first (in that order) before converting live.
+    resample overrides the resize filter; decks are always built with the
+    default one, so they are only consulted without it.
+    """
+    params = dict(width=width, height=height, use_alpha=use_alpha)
+    if dither:
+        params["dither"] = dither  # thresholded frames keep their existing cache keys
+    if resample is not None:
+        params["resample"] = int(resample)
+    if deck is not None and resample is None:
+        frame = deck.get(path, **params)
+        if frame is not None:
+            return frame
+    if cache is not None:
+        frame = cache.get(path, **params)
+        if frame is not None:
+            return frame
+
+    with Image.open(path) as img:
+        img = prepare_image(img, width, height, RESAMPLE if resample is None else resample)
+        frame = PackedFrame.from_image(img, width, height, use_alpha=use_alpha, dither=dither)
+
+    if cache is not None:
+        cache.put(path, frame, **params)
+    return frame
@@ -0,0 +1,17 @@
+"""Image folder scanning shared by the slideshows and the deck builder."""
+import os
+
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+def is_image(name):
+    return name.lower().endswith(IMAGE_EXTS) and not name.startswith(".")
+
+
+def list_images(folder):
+    if not os.path.isdir(folder):
+        print("Image folder does not exist:", folder)
+        return []
+    files = [f for f in os.listdir(folder) if is_image(f)]
+    files.sort()
+    return [os.path.join(folder, f) for f in files]
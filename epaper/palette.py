@@ -0,0 +1,87 @@
+"""
+Nearest-ink palette mapping by perceptual (CIELAB) distance.
+
+Instead of the fixed RGB thresholds, every colour goes to whichever of
+white, black and red looks closest - distance in CIE L*a*b* (D65). The
+decision is precomputed once into a 32x32x32 lookup table over the top 5
+bits of each channel and cached on disk next to the frame cache, so
+mapping a frame is a single fancy index however the decision is made.
+"""
+import functools
+import os
+
+import numpy as np
+
+LUT_BITS = 5
+LUT_VERSION = 1
+
+INKS_RGB = np.array([[255, 255, 255], [0, 0, 0], [255, 0, 0]], np.uint8)  # white, black, red
+D65_WHITE = np.array([0.95047, 1.0, 1.08883])
+SRGB_TO_XYZ = np.array([[0.4124564, 0.3575761, 0.1804375],
+                        [0.2126729, 0.7151522, 0.0721750],
+                        [0.0193339, 0.1191920, 0.9503041]])
+
+
+def rgb_to_lab(rgb):
+    """CIE L*a*b* (D65) for an (..., 3) array of sRGB values in 0..255"""
+    c = np.asarray(rgb, np.float64) / 255
+    linear = np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+    xyz = linear @ SRGB_TO_XYZ.T / D65_WHITE
+    f = np.where(xyz > (6 / 29) ** 3, np.cbrt(xyz), xyz / (3 * (6 / 29) ** 2) + 4 / 29)
+    return np.stack([116 * f[..., 1] - 16,
+                     500 * (f[..., 0] - f[..., 1]),
+                     200 * (f[..., 1] - f[..., 2])], axis=-1)
+
+
+def build_lut(bits=LUT_BITS):
+    """Ink index (0 white, 1 black, 2 red) for the centre of every RGB cell"""
+    size = 1 << bits
+    step = 256 // size
+    levels = np.arange(size) * step + (step - 1) / 2
+    grid = np.stack(np.meshgrid(levels, levels, levels, indexing="ij"), axis=-1)
+    distance = ((rgb_to_lab(grid)[..., None, :] - rgb_to_lab(INKS_RGB)) ** 2).sum(axis=-1)
+    return distance.argmin(axis=-1).astype(np.uint8)
+
+
+def lut_path(bits=LUT_BITS, lut_dir=None):
+    """Where the table is cached - by default in the frame cache's directory"""
+    if lut_dir is None:
+        from .cache import DEFAULT_CACHE_DIR  # not at the top: cache -> frame -> convert -> palette
+        lut_dir = DEFAULT_CACHE_DIR
+    return os.path.join(lut_dir, f"palette-lab-v{LUT_VERSION}-{bits}bit.npy")
+
+
+@functools.lru_cache(maxsize=2)
+def load_lut(bits=LUT_BITS, lut_dir=None):
+    """The lookup table from disk, building and saving it the first time"""
+    path = lut_path(bits, lut_dir)
+    size = 1 << bits
+    try:
+        lut = np.load(path)
+        if lut.shape == (size, size, size) and lut.dtype == np.uint8:
+            return lut
+    except (OSError, ValueError):
+        pass
+
+    lut = build_lut(bits)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, lut)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"Palette table not cached: {e}")
+    return lut
+
+
+def lab_masks(rgb, bits=LUT_BITS):
+    """(black, red) ink masks for an (h, w, 3) uint8 array, nearest ink in Lab"""
+    shift = 8 - bits
+    cell = (rgb[..., 0] >> shift).astype(np.uint16 if bits <= 5 else np.uint32)
+    cell <<= bits
+    cell |= rgb[..., 1] >> shift
+    cell <<= bits
+    cell |= rgb[..., 2] >> shift
+    ink = np.take(load_lut(bits).ravel(), cell)
+    return ink == 1, ink == 2
@@ -0,0 +1,152 @@
+"""
+When partial refreshes have to give way to a full display or a clear.
+
+Every partial refresh drives only its window, from whatever is on the
+glass, and leaves a little of what was there before - more where pixels
+actually flipped. The panel is split into TILE x TILE pixel tiles, each
+carrying a ghosting debt:
+- a partial refresh covering the tile adds PARTIAL_DEBT, plus CHANGE_DEBT
+  times the fraction of its pixels that flipped
+- a cleanup - display_Partial to white, then back to what the glass
+  shows - settles the partial debt of the tiles it covers for
+  CLEANUP_DEBT, which adds up over cleanups until the next full display
+- a full display drives every pixel through the tri-colour waveform and
+  settles the partial debt
+
+RefreshPolicy keeps every tile within a quality budget. A partial update
+that would push any tile over it is sent as a cleanup: the update and
+every tile past CLEANUP_LEVEL of the budget, in at most
+MAX_CLEANUP_WINDOWS tile-aligned windows, each driven to white and back.
+Hammering one corner then costs a couple of black/white refreshes of that
+corner rather than the tri-colour waveform over the whole panel. Where
+the windows hold red (display_Partial cannot drive it), cost more than a
+full display, or would not leave the tiles within CLEANUP_LEVEL, a full
+display is sent instead.
+
+Full displays wear the panel too, FULL_DEBT each. That wear is counted on
+its own, not against the room partials have, and a full display that
+would push it over the budget is preceded by a clear. With the defaults a
+tile takes ten partials that flip it completely, or many more small ones,
+before a cleanup; and 25 full displays go by between clears, the interval
+the direct-buffer script used to hard-code.
+"""
+import numpy as np
+
+from .diff import full_seconds, partial_seconds, red_inside
+from .regions import merge_boxes
+
+TILE = 40  # pixels, a multiple of 8 so tiles cover whole plane bytes
+DEFAULT_BUDGET = 10.0
+UNLIMITED = float("inf")  # a budget that never runs out: no policy at all
+PARTIAL_DEBT = 0.25
+CHANGE_DEBT = 0.75
+FULL_DEBT = 0.4
+CLEANUP_DEBT = 1.0
+CLEANUP_LEVEL = 0.5  # tiles this far into the budget are cleaned along with those past it
+MAX_CLEANUP_WINDOWS = 4
+
+POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+
+
+class RefreshPolicy:
+    """Ghosting debt per tile, and the refresh each planned update should become"""
+
+    def __init__(self, width, height, budget=DEFAULT_BUDGET, tile=TILE):
+        if tile % 8:
+            raise ValueError("tile size must be a multiple of 8")
+        self.budget = budget
+        self.tile = tile
+        self.grid = (-(-height // tile), -(-width // tile))
+        self.debt = np.zeros(self.grid)  # partial debt since the last full display
+        self.fulls = 0  # full displays since the last clear, FULL_DEBT wear each
+        self.cleanups = np.zeros(self.grid)  # per tile, since the last full display
+
+    def partial_debt(self, glass, windows):
+        """Debt each tile would take on from sending windows over glass"""
+        rows, cols = self.grid
+        tile = self.tile
+        flips = np.zeros((rows * tile, cols * tile // 8), np.uint8)
+        refreshes = np.zeros(self.grid)
+        for (x0, y0, x1, y1), window in windows:
+            c0, c1 = x0 // 8, x1 // 8
+            flips[y0:y1, c0:c1] = POPCOUNT[glass.black[y0:y1, c0:c1] ^ window.black]
+            refreshes[y0 // tile:-(-y1 // tile), x0 // tile:-(-x1 // tile)] += 1
+        changed = flips.reshape(rows, tile, cols, tile // 8).sum(axis=(1, 3), dtype=np.int32) / (tile * tile)
+        return PARTIAL_DEBT * refreshes + CHANGE_DEBT * changed
+
+    def floor(self):
+        """Debt each tile is left with once its partial debt is settled"""
+        return self.cleanups * CLEANUP_DEBT
+
+    def tiles(self, boxes):
+        """Boolean grid of the tiles the boxes cover"""
+        covered = np.zeros(self.grid, bool)
+        tile = self.tile
+        for x0, y0, x1, y1 in boxes:
+            covered[y0 // tile:-(-y1 // tile), x0 // tile:-(-x1 // tile)] = True
+        return covered
+
+    def cleanup_boxes(self, debt, glass, windows):
+        """
+        Tile-aligned windows covering the update and the tiles past
+        CLEANUP_LEVEL, or None when a cleanup cannot bring them back
+        within it for less than a full display.
+        """
+        tile = self.tile
+        height, width = glass.height, glass.width
+        hot = debt > self.budget * CLEANUP_LEVEL
+        hot |= self.tiles([box for box, _ in windows])
+        rows, cols = np.nonzero(hot)
+        boxes = merge_boxes([(c * tile, r * tile, min(width, (c + 1) * tile), min(height, (r + 1) * tile))
+                             for r, c in zip(rows, cols)], width, height)
+        if len(boxes) > MAX_CLEANUP_WINDOWS:
+            boxes = [(min(b[0] for b in boxes), min(b[1] for b in boxes),
+                      max(b[2] for b in boxes), max(b[3] for b in boxes))]
+        covered = self.tiles(boxes)
+        if (self.floor() + CLEANUP_DEBT)[covered].max() > self.budget * CLEANUP_LEVEL:
+            return None  # cleanups have worn these tiles too
+        if any(red_inside(glass, box) for box in boxes) or any((window.red != 0xFF).any() for _, window in windows):
+            return None  # the black/white waveform would wash the red out
+        if 2 * partial_seconds(glass, boxes) >= full_seconds(glass):
+            return None
+        return boxes
+
+    def review(self, kind, glass, windows):
+        """
+        (kind, boxes) for a planned update: "partial" while every tile
+        stays within budget; "cleanup" with the windows to drive to white
+        and back - to the glass with the update's windows in place - when
+        that brings it back within budget; else
+        "full", which becomes "clean" (clear, then display) once the wear
+        of full displays has used up the budget. boxes is None unless cleaning up.
+        """
+        if kind == "partial":
+            debt = self.debt + self.partial_debt(glass, windows)
+            if debt.max() <= self.budget:
+                return kind, None
+            boxes = self.cleanup_boxes(debt, glass, windows)
+            if boxes:
+                return "cleanup", boxes
+            kind = "full"
+        if kind == "full" and (self.fulls + 1) * FULL_DEBT > self.budget:
+            kind = "clean"
+        return kind, None
+
+    def record(self, kind, glass, windows):
+        """Account for an update about to be sent over glass"""
+        if kind == "partial":
+            self.debt += self.partial_debt(glass, windows)
+        elif kind == "cleanup":
+            covered = self.tiles([box for box, _ in windows])
+            self.cleanups[covered] += 1
+            self.debt[covered] = self.floor()[covered]
+        elif kind in ("full", "clean"):
+            self.fulls = 1 if kind == "clean" else self.fulls + 1
+            self.cleanups[:] = 0
+            self.debt[:] = 0
+
+    def reset(self):
+        """The panel was cleared"""
+        self.fulls = 0
+        self.cleanups[:] = 0
+        self.debt[:] = 0
@@ -0,0 +1,190 @@
+"""
+Find where an overlay has content, as rectangles a partial refresh can send.
+
+Boxes are (x0, y0, x1, y1) with x0/x1 on byte (8 pixel) boundaries so they
+can be cut straight out of the packed planes.
+
+Separate blobs of ink are found with a run-based connected-component pass:
+each row is split into runs of content pixels, runs that touch a run on the
+row above (8-connectivity) are joined with a vectorized union-find, and each
+component's box is reduced from its runs. Memory scales with the number of
+runs, not the number of inked pixels. The same runs give each component's
+moments, which is all the circle detector needs.
+"""
+import numpy as np
+
+from .frame import HEIGHT, WIDTH
+from .timing import BW_REFRESH_S, MIN_WINDOW_FRACTION, SPI_HZ
+
+MAX_COMPONENTS = 64  # past this, speckle - one box around everything
+
+
+def align_box(x0, y0, x1, y1, width, height, margin=0):
+    """Pad a box (exclusive ends) by margin, clamp it to the panel and widen x to whole bytes"""
+    x0 = max(0, (x0 - margin) // 8 * 8)
+    x1 = min(width, (x1 + margin + 7) // 8 * 8)
+    y0 = max(0, y0 - margin)
+    y1 = min(height, y1 + margin)
+    return x0, y0, x1, y1
+
+
+def _runs(mask):
+    """Row, start and (exclusive) end of every horizontal run of True in mask"""
+    height, width = mask.shape
+    padded = np.zeros((height, width + 2), np.int8)
+    padded[:, 1:-1] = mask
+    edges = np.diff(padded, axis=1).ravel()
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    stride = width + 1
+    return starts // stride, starts % stride, ends % stride
+
+
+def label_runs(mask):
+    """
+    Connected components (8-connectivity) of a boolean mask, as runs.
+    Returns (rows, starts, ends, labels) with labels numbered 0..n-1.
+    """
+    rows, starts, ends = _runs(mask)
+    count = len(rows)
+    if not count:
+        return rows, starts, ends, np.zeros(0, np.intp)
+
+    # A run on row y touches runs on row y-1 that overlap [start-1, end]. Runs
+    # are sorted by (row, start), so both bounds come from one searchsorted.
+    stride = mask.shape[1] + 2
+    first = rows * stride + starts
+    last = rows * stride + ends
+    above = (rows - 1) * stride
+    lo = np.searchsorted(last, above + starts, side="left")
+    hi = np.searchsorted(first, above + ends, side="right")
+    links = np.maximum(hi - lo, 0)
+    a = np.repeat(np.arange(count), links)
+    b = np.repeat(lo - np.cumsum(links) + links, links) + np.arange(links.sum())
+
+    # Hook every link onto the smaller root, then shortcut, until stable
+    parent = np.arange(count)
+    while True:
+        pa, pb = parent[a], parent[b]
+        low = np.minimum(pa, pb)
+        before = parent.copy()
+        np.minimum.at(parent, pa, low)
+        np.minimum.at(parent, pb, low)
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+        if np.array_equal(parent, before):
+            break
+
+    _, labels = np.unique(parent, return_inverse=True)
+    return rows, starts, ends, labels
+
+
+def component_boxes(mask):
+    """Exclusive (x0, y0, x1, y1) bounding box of each connected component in mask"""
+    rows, starts, ends, labels = label_runs(mask)
+    count = labels.max() + 1 if len(labels) else 0
+    boxes = np.empty((count, 4), np.intp)
+    boxes[:, 0:2] = np.iinfo(np.intp).max
+    boxes[:, 2:4] = -1
+    np.minimum.at(boxes[:, 0], labels, starts)
+    np.minimum.at(boxes[:, 1], labels, rows)
+    np.maximum.at(boxes[:, 2], labels, ends)
+    np.maximum.at(boxes[:, 3], labels, rows + 1)
+    return [tuple(int(v) for v in box) for box in boxes]
+
+
+def component_circles(mask, min_area=16):
+    """
+    (center_x, center_y, radius) of each connected component in mask, from
+    its moments: centre is the centroid, radius the distance to its farthest
+    pixel, so the circle always covers the blob. Components smaller than
+    min_area pixels are dropped as specks.
+    """
+    rows, starts, ends, labels = label_runs(mask)
+    if not len(labels):
+        return []
+    lengths = ends - starts
+    area = np.bincount(labels, weights=lengths)
+    sum_x = np.bincount(labels, weights=(starts + ends - 1) * lengths / 2)
+    sum_y = np.bincount(labels, weights=rows * lengths)
+    cx = np.rint(sum_x / area).astype(np.intp)
+    cy = np.rint(sum_y / area).astype(np.intp)
+
+    # The farthest pixel of a run from the centre is one of its two ends
+    dx = np.maximum(np.abs(starts - cx[labels]), np.abs(ends - 1 - cx[labels]))
+    dy = rows - cy[labels]
+    far = np.zeros(len(area), np.intp)
+    np.maximum.at(far, labels, dx * dx + dy * dy)
+    radius = np.ceil(np.sqrt(far)).astype(np.intp) + 1
+
+    keep = area >= min_area
+    return [(int(x), int(y), int(r)) for x, y, r in zip(cx[keep], cy[keep], radius[keep])]
+
+
+def frame_ink(frame):
+    """Boolean mask of the pixels of a packed frame with black or red ink"""
+    return np.unpackbits(~(frame.black & frame.red), axis=1).view(bool)
+
+
+def frame_regions(frame, margin=0):
+    """
+    The cheapest set of padded, 8-pixel-aligned boxes covering the ink of a
+    packed frame, found on whole bytes so the planes are never unpacked.
+    """
+    inked = (frame.black & frame.red) != 0xFF
+    boxes = component_boxes(inked)
+    if len(boxes) > MAX_COMPONENTS:
+        rows = np.flatnonzero(inked.any(axis=1))
+        cols = np.flatnonzero(inked.any(axis=0))
+        boxes = [(cols[0], rows[0], cols[-1] + 1, rows[-1] + 1)]
+    padded = [align_box(c0 * 8, y0, c1 * 8, y1, frame.width, frame.height, margin)
+              for c0, y0, c1, y1 in boxes]
+    return merge_boxes(padded, frame.width, frame.height)
+
+
+def refresh_overhead(width=WIDTH, height=HEIGHT):
+    """
+    Fixed cost of a partial refresh on top of the pixels it sends, in plane
+    bytes: the waveform runs for MIN_WINDOW_FRACTION of a refresh whatever
+    the window size (timing.py), against the time each byte adds in
+    waveform area and SPI transfer.
+    """
+    per_byte = (1 - MIN_WINDOW_FRACTION) * BW_REFRESH_S / (width // 8 * height) + 8 / SPI_HZ
+    return MIN_WINDOW_FRACTION * BW_REFRESH_S / per_byte
+
+
+def refresh_cost(boxes, overhead):
+    """Plane bytes sent plus the fixed per-refresh overhead, for each box"""
+    boxes = np.asarray(boxes)
+    return (boxes[:, 2] - boxes[:, 0]) // 8 * (boxes[:, 3] - boxes[:, 1]) + overhead
+
+
+def merge_boxes(boxes, width=WIDTH, height=HEIGHT):
+    """
+    Greedily merge the pair of boxes whose union saves the most refresh cost
+    on a width x height panel, until no merge saves anything. Boxes must
+    already be byte aligned.
+    """
+    overhead = refresh_overhead(width, height)
+    boxes = np.array(boxes, np.intp).reshape(-1, 4)
+    while len(boxes) > 1:
+        union = np.stack([
+            np.minimum.outer(boxes[:, 0], boxes[:, 0]),
+            np.minimum.outer(boxes[:, 1], boxes[:, 1]),
+            np.maximum.outer(boxes[:, 2], boxes[:, 2]),
+            np.maximum.outer(boxes[:, 3], boxes[:, 3]),
+        ], axis=-1)
+        cost = refresh_cost(boxes, overhead)
+        saving = (cost[:, None] + cost[None, :]
+                  - refresh_cost(union.reshape(-1, 4), overhead).reshape(union.shape[:2]))
+        np.fill_diagonal(saving, -1)
+        i, j = np.unravel_index(np.argmax(saving), saving.shape)
+        if saving[i, j] <= 0:
+            break
+        boxes[i] = union[i, j]
+        boxes = np.delete(boxes, j, axis=0)
+    return [tuple(int(v) for v in box) for box in boxes]
+
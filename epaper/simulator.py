@@ -0,0 +1,235 @@
+"""
+Software stand-in for waveshare_epd.epd7in5b_V2, for running and timing the
+slideshows without a panel.
+
+EPD implements the driver methods the scripts use on top of a small model
+of the panel controller: panel RAM for the 0x10 (black, 1 = white) and 0x13
+(red, 1 = red) planes, the partial window commands (0x91/0x90/0x92) and the
+refresh (0x12) that copies RAM onto the glass. SPI time follows a
+configurable bus speed and each refresh adds a configurable waveform time;
+both are accumulated in EPD.stats and only slept for with realtime=True.
+
+Scripts pick it up through load_driver():
+
+    EPAPER_SIMULATOR=1 EPAPER_SIM_DIR=/tmp/panel python3 slideshow-memory-canvas.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+from .timing import BW_REFRESH_S, FULL_REFRESH_S, MIN_WINDOW_FRACTION, SPI_HZ, env_float
+
+EPD_WIDTH = 800
+EPD_HEIGHT = 480
+
+
+def load_driver():
+    """The waveshare epd7in5b_V2 module, or this simulator when EPAPER_SIMULATOR is set"""
+    if os.environ.get("EPAPER_SIMULATOR"):
+        print("🧪 Using simulated e-Paper panel")
+        return sys.modules[__name__]
+    from waveshare_epd import epd7in5b_V2
+    return epd7in5b_V2
+
+
+class EPD:
+    """Simulated 7.5" (B) V2 panel with the waveshare driver's interface"""
+
+    def __init__(self, spi_hz=None, full_refresh_s=None, bw_refresh_s=None,
+                 realtime=None, dump_dir=None):
+        self.width = EPD_WIDTH
+        self.height = EPD_HEIGHT
+        self.spi_hz = spi_hz or env_float("EPAPER_SIM_SPI_HZ", SPI_HZ)
+        self.full_refresh_s = full_refresh_s if full_refresh_s is not None else env_float("EPAPER_SIM_FULL_S", FULL_REFRESH_S)
+        self.bw_refresh_s = bw_refresh_s if bw_refresh_s is not None else env_float("EPAPER_SIM_BW_S", BW_REFRESH_S)
+        self.realtime = bool(os.environ.get("EPAPER_SIM_REALTIME")) if realtime is None else realtime
+        self.dump_dir = dump_dir if dump_dir is not None else os.environ.get("EPAPER_SIM_DIR")
+
+        cols = self.width // 8
+        self.ram = {0x10: np.full((self.height, cols), 0xFF, np.uint8),
+                    0x13: np.zeros((self.height, cols), np.uint8)}
+        self.glass_black = self.ram[0x10].copy()
+        self.glass_red = self.ram[0x13].copy()
+        self.stats = {"spi_bytes": 0, "spi_seconds": 0.0, "busy_seconds": 0.0,
+                      "full_refreshes": 0, "partial_refreshes": 0, "commands": 0}
+        self.bw_mode = False
+        self._reset_window()
+        self._command = None
+        self._params = []
+        self._cursor = 0
+        self._busy = 0.0
+        self._dumps = 0
+
+    # -- controller model --------------------------------------------------
+
+    def _reset_window(self):
+        self.partial = False
+        self.window = (0, 0, self.width, self.height)
+
+    def _spi(self, nbytes):
+        seconds = nbytes * 8 / self.spi_hz
+        self.stats["spi_bytes"] += nbytes
+        self.stats["spi_seconds"] += seconds
+        if self.realtime:
+            time.sleep(seconds)
+
+    def _write_ram(self, data):
+        """Data bytes fill the current window row by row, like the controller's RAM pointer"""
+        x0, y0, x1, y1 = self.window
+        c0, c1 = x0 // 8, (x1 + 7) // 8
+        region = self.ram[self._command][y0:y1, c0:c1]
+        start, end = self._cursor, min(self._cursor + len(data), region.size)
+        index = np.arange(start, end)
+        region[index // (c1 - c0), index % (c1 - c0)] = data[:end - start]
+        self._cursor = end
+
+    def _set_window(self, p):
+        x0 = (p[0] << 8 | p[1]) // 8 * 8
+        x1 = (p[2] << 8 | p[3]) + 1
+        y0 = p[4] << 8 | p[5]
+        y1 = (p[6] << 8 | p[7]) + 1
+        self.window = (x0, y0, min(self.width, (x1 + 7) // 8 * 8), min(self.height, y1))
+
+    def _refresh(self):
+        x0, y0, x1, y1 = self.window
+        c0, c1 = x0 // 8, (x1 + 7) // 8
+        self.glass_black[y0:y1, c0:c1] = self.ram[0x10][y0:y1, c0:c1]
+        if self.bw_mode:
+            self.glass_red[y0:y1, c0:c1] = 0  # black/white waveform leaves no red
+            seconds = self.bw_refresh_s
+        else:
+            self.glass_red[y0:y1, c0:c1] = self.ram[0x13][y0:y1, c0:c1]
+            seconds = self.full_refresh_s
+        area = (x1 - x0) * (y1 - y0) / (self.width * self.height)
+        if self.partial or area < 1:
+            seconds *= MIN_WINDOW_FRACTION + (1 - MIN_WINDOW_FRACTION) * area
+            self.stats["partial_refreshes"] += 1
+        else:
+            self.stats["full_refreshes"] += 1
+        self._busy += seconds
+        if self.dump_dir:
+            self._dumps += 1
+            os.makedirs(self.dump_dir, exist_ok=True)
+            self.save_png(os.path.join(self.dump_dir, f"panel-{self._dumps:04d}.png"))
+
+    # -- driver primitives ---------------------------------------------------
+
+    def send_command(self, command):
+        self._spi(1)
+        self.stats["commands"] += 1
+        self._command = command
+        self._params = []
+        self._cursor = 0
+        if command == 0x91:    # PARTIAL IN
+            self.partial = True
+        elif command == 0x92:  # PARTIAL OUT
+            self._reset_window()
+        elif command == 0x12:  # DISPLAY REFRESH
+            self._refresh()
+
+    def send_data(self, data):
+        data = [data] if isinstance(data, int) else list(data)
+        self._spi(len(data))
+        if self._command in self.ram:
+            self._write_ram(np.array(data, np.uint8))
+        elif self._command == 0x90:  # PARTIAL WINDOW
+            self._params.extend(data)
+            if len(self._params) >= 8:
+                self._set_window(self._params)
+
+    def send_data2(self, data):
+        buf = np.frombuffer(bytes(data), np.uint8) if not isinstance(data, np.ndarray) else data.reshape(-1)
+        self._spi(len(buf))
+        if self._command in self.ram:
+            self._write_ram(buf)
+
+    def ReadBusy(self):
+        self.stats["busy_seconds"] += self._busy
+        if self.realtime:
+            time.sleep(self._busy)
+        self._busy = 0.0
+
+    # -- driver API --------------------------------------------------------
+
+    def init(self):
+        self.bw_mode = False
+        self._reset_window()
+        return 0
+
+    def init_part(self):
+        self.bw_mode = True
+        self._reset_window()
+        return 0
+
+    def getbuffer(self, image):
+        imwidth, imheight = image.size
+        if (imwidth, imheight) == (self.width, self.height):
+            img = image.convert("1")
+        elif (imwidth, imheight) == (self.height, self.width):
+            img = image.rotate(90, expand=True).convert("1")
+        else:
+            # display_Partial callers pass cropped windows
+            img = image.convert("1")
+        return bytearray(np.invert(np.frombuffer(img.tobytes("raw"), np.uint8)).tobytes())
+
+    def display(self, imageblack, imagered):
+        # Like the driver, the black buffer is inverted back in place
+        black = np.frombuffer(imageblack, np.uint8) if isinstance(imageblack, bytearray) else np.array(imageblack, np.uint8)
+        black ^= 0xFF
+        self.send_command(0x10)
+        self.send_data2(black)
+        self.send_command(0x13)
+        self.send_data2(imagered)
+        self.send_command(0x12)
+        self.ReadBusy()
+
+    def display_Partial(self, Image, Xstart, Ystart, Xend, Yend):
+        """
+        Partial update of a window; the buffer is getbuffer() format (1 = black).
+        Black/white after init_part(), as the driver expects; called in init()
+        mode it runs (and is charged) the tri-colour waveform, so a missing
+        init_part() shows up in the timings.
+        """
+        self.send_command(0x91)
+        self.send_command(0x90)
+        self.send_data([Xstart >> 8, Xstart & 0xFF, (Xend - 1) >> 8, (Xend - 1) & 0xFF,
+                        Ystart >> 8, Ystart & 0xFF, (Yend - 1) >> 8, (Yend - 1) & 0xFF, 0x01])
+        self.send_command(0x10)
+        self.send_data2(np.invert(np.frombuffer(bytes(Image), np.uint8)))
+        self._spi(1)
+        self.stats["commands"] += 1
+        self._refresh()
+        self.ReadBusy()
+        self.send_command(0x92)
+
+    def Clear(self):
+        size = self.width // 8 * self.height
+        self.send_command(0x10)
+        self.send_data2(b"\xff" * size)
+        self.send_command(0x13)
+        self.send_data2(b"\x00" * size)
+        self.send_command(0x12)
+        self.ReadBusy()
+
+    def sleep(self):
+        self.send_command(0x02)  # POWER OFF
+        self.ReadBusy()
+        self.send_command(0x07)  # DEEP SLEEP
+        self.send_data(0xA5)
+
+    # -- inspection ----------------------------------------------------------
+
+    def to_image(self):
+        """What is currently on the glass, as an RGB image"""
+        black = np.unpackbits(self.glass_black, axis=1) == 0
+        red = np.unpackbits(self.glass_red, axis=1) == 1
+        rgb = np.full((self.height, self.width, 3), 255, np.uint8)
+        rgb[black] = (0, 0, 0)
+        rgb[red] = (255, 0, 0)
+        return Image.fromarray(rgb)
+
+    def save_png(self, path):
+        self.to_image().save(path)
@@ -0,0 +1,88 @@
+"""
+What is on the glass, persisted so a restarted slideshow can skip its Clear.
+
+With Restart=always a crashing slideshow would otherwise pay a ~15 s
+tri-colour clear on every restart. The state file holds the packed black
+and red planes on the glass plus the canvas layer count, at fixed offsets
+after a small header, so it can be memory-mapped. Canvas strategies add
+the canvas planes after them: the glass can lag the canvas (a held-back
+red change, ink outside a circle window), so neither stands in for the
+other. It is written atomically after each refresh completes and removed
+just before the next one starts, so a crash mid-refresh leaves no state
+and the next start clears as usual.
+
+There is one state file for the panel, tagged with the script that wrote
+it; another script's state is ignored. It lives on tmpfs by default - the
+glass keeps its image across a reboot, but scripts that do not keep the
+state may have drawn over it, so a reboot starting from a Clear is the
+safe choice.
+"""
+import contextlib
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from .frame import PackedFrame
+
+DEFAULT_STATE_DIR = os.environ.get(
+    "EPAPER_STATE_DIR", os.path.join(os.environ.get("XDG_RUNTIME_DIR", "/dev/shm"), "epaper"))
+STATE_NAME = "panel.state"
+
+MAGIC = b"EPS1"
+HEADER = struct.Struct("<4sHHI32s")  # magic, width, height, layer count, owner
+
+
+def save_state(path, frame, owner, layer_count=0, canvas=None):
+    """Atomically write header + black plane + red plane [+ canvas black + canvas red]"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, frame.width, frame.height, layer_count, owner.encode()))
+        for planes in (frame, canvas) if canvas is not None else (frame,):
+            f.write(planes.black.tobytes())
+            f.write(planes.red.tobytes())
+    os.replace(tmp, path)
+
+
+def load_state(path, owner, width, height):
+    """
+    (frame, layer_count, canvas) from a state file written by owner at this
+    size, else None. canvas is None unless the file holds one.
+    """
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if len(data) < HEADER.size:
+                return None
+            magic, w, h, layer_count, tag = HEADER.unpack_from(data)
+            plane = width // 8 * height
+            frames = (len(data) - HEADER.size) // (2 * plane)
+            if (magic != MAGIC or (w, h) != (width, height) or tag.rstrip(b"\0") != owner.encode()
+                    or frames not in (1, 2) or len(data) != HEADER.size + frames * 2 * plane):
+                return None
+            # Copied out of the map: canvases overlay onto their master in place
+            planes = np.frombuffer(data, np.uint8, offset=HEADER.size).reshape(2 * frames, height, width // 8).copy()
+    except (OSError, ValueError):
+        return None
+    canvas = PackedFrame(planes[2], planes[3]) if frames == 2 else None
+    return PackedFrame(planes[0], planes[1]), layer_count, canvas
+
+
+class PanelState:
+    """The state file as seen by one script"""
+
+    def __init__(self, owner, state_dir=DEFAULT_STATE_DIR):
+        self.owner = owner
+        self.path = os.path.join(state_dir, STATE_NAME)
+        os.makedirs(state_dir, exist_ok=True)
+
+    def load(self, width, height):
+        """(frame, layer_count, canvas) on the glass if this script left it there, else None"""
+        return load_state(self.path, self.owner, width, height)
+
+    def save(self, frame, layer_count=0, canvas=None):
+        save_state(self.path, frame, self.owner, layer_count, canvas)
+
+    def forget(self):
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.path)
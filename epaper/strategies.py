@@ -0,0 +1,259 @@
+"""
+Display strategies for the slideshow engine.
+
+A strategy turns each loaded frame into a panel update in two steps:
+- compose: what the panel should show - the frame itself, or a canvas
+  the frame is overlaid onto
+- plan: how to get there from what is on the glass - ("skip", ...),
+  ("full", ...) or ("partial", ...) with windows, each sent with
+  display_Partial, or with both planes where it has red (send_windows)
+A RefreshPolicy (policy.py) then reviews the plan against the ghosting
+debt on the panel, turning it into a cleanup of the worn tiles, a full
+display or a clear when the quality budget calls for one. Reviewing,
+sending the result and tracking what is on the glass are shared, so every
+strategy gets the same bulk transfers and the same bookkeeping.
+"""
+import numpy as np
+
+from .diff import (RED_DEFER_BYTES, full_seconds, panel_mode, partial_seconds, plan_black_first,
+                   send_windows)
+from .display import clear, display_frame
+from .frame import PackedFrame
+from .policy import DEFAULT_BUDGET, UNLIMITED, RefreshPolicy
+from .regions import align_box, component_circles, frame_ink, frame_regions
+
+
+def paste(frame, windows):
+    """Write (box, window frame) pairs into frame, in place"""
+    for (x0, y0, x1, y1), window in windows:
+        frame.black[y0:y1, x0 // 8:x1 // 8] = window.black
+        frame.red[y0:y1, x0 // 8:x1 // 8] = window.red
+    return frame
+
+
+class Strategy:
+    """Full display of every frame"""
+
+    name = "full"
+    use_alpha = False     # transparent pixels get no ink - for overlays
+    canvas = False        # overlay frames onto an accumulated canvas
+    partial_mode = False  # keep the panel in init_part() mode between full refreshes
+    max_layers = None     # canvas layers before the canvas starts over
+    budget = DEFAULT_BUDGET  # ghosting debt a tile may carry; UNLIMITED turns the policy off
+
+    def __init__(self, epd, budget=None):
+        self.epd = epd
+        self.glass = None   # what is on the panel
+        self.master = None  # the canvas, for canvas strategies
+        self.count = 0      # frames (canvas layers) since the canvas was last emptied
+        self.fresh = False  # the canvas has just started over
+        self.counts = {"skip": 0, "partial": 0, "cleanup": 0, "full": 0, "clean": 0}
+        if budget is not None:
+            self.budget = budget
+        self.policy = RefreshPolicy(epd.width, epd.height, self.budget) if self.budget != UNLIMITED else None
+
+    def start(self, restored=None):
+        """
+        Bring the panel up. restored is (frame, count, canvas) when
+        PanelState knows what is on the glass; otherwise the panel is cleared.
+        """
+        self.epd.init()
+        if restored:
+            frame, self.count, canvas = restored
+            self.glass = frame
+            if self.canvas:
+                self.master = canvas if canvas is not None else frame.copy()
+        else:
+            self._clear()
+        if self.partial_mode:
+            self.epd.init_part()
+
+    def _clear(self):
+        clear(self.epd)
+        self.glass = PackedFrame.blank(self.epd.width, self.epd.height)
+        if self.canvas:
+            self.master = self.glass.copy()
+        self.count = 0
+        if self.policy is not None:
+            self.policy.reset()
+
+    def compose(self, frame):
+        """The frame the panel should show next"""
+        self.fresh = False
+        if self.max_layers is not None and self.count >= self.max_layers:
+            print(f"🔄 Canvas has {self.count} layers - starting over")
+            self.master = PackedFrame.blank(self.epd.width, self.epd.height)
+            self.count = 0
+            self.fresh = True
+        self.count += 1
+        if not self.canvas:
+            return frame
+        self.master.overlay(frame, red_over_black=True)
+        return self.master
+
+    def plan(self, target, frame):
+        """(kind, target, [(box, window frame), ...]) to bring the panel to target"""
+        return "full", target, []
+
+    def windows(self, target, boxes):
+        """(box, window frame) pairs cut from target"""
+        return [(box, target.crop(*box)) for box in boxes]
+
+    def partial(self, target, windows):
+        """("partial", ...) with the windows, or ("full", ...) where one full display is quicker"""
+        if partial_seconds(target, [box for box, _ in windows], self.glass) < full_seconds(target):
+            return "partial", target, windows
+        return "full", target, []
+
+    def review(self, update):
+        """The plan as the refresh policy wants it sent"""
+        kind, target, windows = update
+        if self.policy is None or kind == "skip":
+            return update
+        reviewed, boxes = self.policy.review(kind, self.glass, windows)
+        if reviewed == "cleanup":
+            # Back to what the update would leave: the tiles around it keep what is on the glass
+            windows = self.windows(paste(self.glass.copy(), windows), boxes)
+        return reviewed, target, windows if reviewed in ("partial", "cleanup") else []
+
+    def send(self, update):
+        """Carry out a reviewed plan; returns its kind"""
+        kind, target, windows = update
+        if self.policy is not None:
+            self.policy.record(kind, self.glass, windows)
+        if kind in ("full", "clean"):
+            if self.partial_mode:
+                self.epd.init()
+            if kind == "clean":
+                clear(self.epd)  # white first, wiping what the full waveform leaves behind
+            display_frame(self.epd, target)
+            if self.partial_mode:
+                self.epd.init_part()
+            self.glass = target.copy()  # frames from a deck are views into its mmap
+        elif kind in ("partial", "cleanup"):
+            if kind == "cleanup":  # windows without red, on the black/white waveform
+                with panel_mode(self.epd, True, self.partial_mode):
+                    for box, window in windows:
+                        # white first, so the window is driven the whole way from a known state
+                        self.epd.display_Partial(bytearray(window.black.nbytes), *box)
+                        self.epd.display_Partial(window.buffers()[0], *box)
+            else:
+                send_windows(self.epd, self.glass, windows, self.partial_mode)
+            paste(self.glass, windows)
+        self.counts[kind] += 1
+        return kind
+
+
+class FullRefresh(Strategy):
+    """Every frame with a full display, no clears - ghosting builds up"""
+
+    budget = UNLIMITED
+
+
+class DirectBuffer(Strategy):
+    """Full displays straight from the packed planes, cleared when the policy calls for it"""
+
+    name = "direct"
+
+
+class DiffRefresh(Strategy):
+    """Each frame as the cheapest update from the last: skipped, partial windows or full"""
+
+    name = "diff"
+    red_defer = RED_DEFER_BYTES  # red plane bytes a frame may change and have held back; 0 never holds
+    red_wait = 3                 # frames a red change may be held back for
+
+    def __init__(self, epd, budget=None):
+        super().__init__(epd, budget)
+        self.held = 0  # frames the glass has been missing red changes for
+
+    def plan(self, target, frame):
+        max_red = self.red_defer if self.held < self.red_wait else 0
+        kind, boxes, shown = plan_black_first(self.glass, target, max_red)
+        self.held = self.held + 1 if shown is not target else 0
+        # Windows cut from what is shown; a full display brings the held-back red along
+        return kind, target, self.windows(shown, boxes or [])
+
+
+class PartialGhost(Strategy):
+    """Partial refreshes over the windows where each new frame has ink"""
+
+    name = "partial-ghost"
+    use_alpha = True
+    partial_mode = True
+    margin = 50
+
+    def plan(self, target, frame):
+        boxes = frame_regions(frame, self.margin)
+        if not boxes or self.count == 1:  # first frame after a clear, or nothing to frame
+            return "full", target, []
+        return self.partial(target, self.windows(target, boxes))
+
+
+class MemoryCanvas(DiffRefresh):
+    """Frames accumulate on a canvas, shown with diff updates; it starts over every 20 layers"""
+
+    name = "memory-canvas"
+    use_alpha = True
+    canvas = True
+    max_layers = 20
+
+
+class MemoryPartial(Strategy):
+    """Frames accumulate on a canvas; only the windows around each new frame's ink are sent"""
+
+    name = "memory-partial"
+    use_alpha = True
+    canvas = True
+    partial_mode = True
+    max_layers = 15
+    margin = 20
+
+    def plan(self, target, frame):
+        if self.fresh:  # the old canvas has to go too
+            return "full", target, []
+        boxes = frame_regions(frame, self.margin)
+        if not boxes:
+            return "skip", target, []
+        return self.partial(target, self.windows(target, boxes))
+
+
+class CircularRefresh(Strategy):
+    """
+    Frames accumulate on a canvas; each new circle of ink is sent in a window
+    around it, changing only the pixels inside the circle.
+    """
+
+    name = "circular"
+    use_alpha = True
+    canvas = True
+    partial_mode = True
+    max_layers = 15
+    margin = 10
+
+    def plan(self, target, frame):
+        if self.fresh:
+            return "full", target, []
+        circles = component_circles(frame_ink(frame))
+        if not circles:
+            return "skip", target, []
+
+        inside = np.zeros((target.height, target.width), bool)
+        boxes = []
+        for cx, cy, radius in circles:
+            x0, y0, x1, y1 = align_box(cx - radius, cy - radius, cx + radius + 1, cy + radius + 1,
+                                       target.width, target.height, self.margin)
+            yy, xx = np.ogrid[y0:y1, x0:x1]
+            inside[y0:y1, x0:x1] |= (xx - cx) ** 2 + (yy - cy) ** 2 <= radius * radius
+            boxes.append((x0, y0, x1, y1))
+
+        # The glass outside the circles, the canvas inside them - built once
+        # so overlapping windows agree
+        keep = np.packbits(inside, axis=1)
+        after = PackedFrame((self.glass.black & ~keep) | (target.black & keep),
+                            (self.glass.red & ~keep) | (target.red & keep))
+        return self.partial(target, self.windows(after, boxes))
+
+
+STRATEGIES = {cls.name: cls for cls in (FullRefresh, DirectBuffer, DiffRefresh, PartialGhost, MemoryCanvas,
+                                        MemoryPartial, CircularRefresh)}
@@ -0,0 +1,22 @@
+"""
+Timing model of the 7.5" (B) V2 panel: SPI bus speed and waveform times.
+
+The update planner (diff.py) and the refresh policy weigh partial windows
+against full displays with it, and the simulator charges the same times.
+EPAPER_SPI_HZ, EPAPER_FULL_S and EPAPER_BW_S override the defaults for a
+bus or panel that measures differently.
+"""
+import os
+
+
+def env_float(name, default):
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+SPI_HZ = env_float("EPAPER_SPI_HZ", 4000000)        # epdconfig's SPI max_speed_hz
+FULL_REFRESH_S = env_float("EPAPER_FULL_S", 15.0)   # tri-colour waveform
+BW_REFRESH_S = env_float("EPAPER_BW_S", 3.5)        # black/white waveform (init_part, display_Partial)
+MIN_WINDOW_FRACTION = 0.25  # a partial window never costs less than this share of a refresh
@@ -0,0 +1,218 @@
+"""
+Incrementally updated index of the image folder.
+
+Uses Linux inotify through ctypes, so a newly generated image is picked up
+within milliseconds instead of on the next os.listdir() pass. Only finished
+files count: a file is added when it is closed after writing or renamed into
+place (rsync's hidden ".name.XXXXXX" temp files never match). Where inotify
+is unavailable the folder is polled on its mtime instead, and files still
+being written are held back until they have settled.
+"""
+import bisect
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+
+from .images import is_image
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+def _inotify_libc():
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        libc.inotify_init1
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class ImageWatcher:
+    """Sorted index of the images in folder, with add/remove events"""
+
+    def __init__(self, folder, use_inotify=True, poll_interval=2.0, settle=0.5):
+        self.folder = folder
+        self.poll_interval = poll_interval
+        self.settle = settle
+        self.images = []        # sorted file names
+        self._pending = []      # names added since start, not yet shown by cycle()
+        self._unsettled = set()
+        self._dir_mtime = None
+        self._fd = None
+        self._libc = _inotify_libc() if use_inotify else None
+        self._start_inotify()
+        self._poll_folder([], initial=True)
+
+    @property
+    def using_inotify(self):
+        return self._fd is not None
+
+    def paths(self):
+        return [os.path.join(self.folder, name) for name in self.images]
+
+    def _start_inotify(self):
+        if self._libc is None or self._fd is not None or not os.path.isdir(self.folder):
+            return
+        fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            print(f"inotify unavailable ({os.strerror(ctypes.get_errno())}), polling {self.folder}")
+            self._libc = None
+            return
+        if self._libc.inotify_add_watch(fd, os.fsencode(self.folder), WATCH_MASK) < 0:
+            print(f"Could not watch {self.folder} ({os.strerror(ctypes.get_errno())}), polling instead")
+            os.close(fd)
+            self._libc = None
+            return
+        self._fd = fd
+
+    def _add(self, name, events):
+        i = bisect.bisect_left(self.images, name)
+        if i < len(self.images) and self.images[i] == name:
+            return
+        self.images.insert(i, name)
+        self._pending.append(name)
+        events.append(("add", os.path.join(self.folder, name)))
+
+    def _remove(self, name, events):
+        i = bisect.bisect_left(self.images, name)
+        if i < len(self.images) and self.images[i] == name:
+            del self.images[i]
+            events.append(("remove", os.path.join(self.folder, name)))
+        if name in self._pending:
+            self._pending.remove(name)
+        self._unsettled.discard(name)
+
+    def _scan(self, events, initial=False):
+        """Full rescan - used at start, after an inotify overflow, and when polling"""
+        try:
+            names = {f for f in os.listdir(self.folder) if is_image(f)}
+        except OSError:
+            names = set()
+
+        now = time.time()
+        for name in sorted(names - set(self.images)):
+            if self._fd is None and not initial:
+                try:
+                    if now - os.stat(os.path.join(self.folder, name)).st_mtime < self.settle:
+                        self._unsettled.add(name)  # possibly still being written
+                        continue
+                except OSError:
+                    continue
+            self._unsettled.discard(name)
+            if initial:
+                bisect.insort(self.images, name)
+            else:
+                self._add(name, events)
+        for name in set(self.images) - names:
+            self._remove(name, events)
+
+    def _read_inotify(self, events):
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset < len(data):
+            _, mask, _, length = EVENT.unpack_from(data, offset)
+            raw = data[offset + EVENT.size:offset + EVENT.size + length]
+            offset += EVENT.size + length
+            name = os.fsdecode(raw.rstrip(b"\0"))
+
+            if mask & IN_Q_OVERFLOW:
+                self._scan(events)
+            elif mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                # Folder itself went away - fall back to polling until it returns
+                os.close(self._fd)
+                self._fd = None
+                self._scan(events)
+                return
+            elif not is_image(name):
+                continue
+            elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                self._add(name, events)
+            elif mask & (IN_MOVED_FROM | IN_DELETE):
+                self._remove(name, events)
+
+    def _poll_folder(self, events, initial=False):
+        try:
+            mtime = os.stat(self.folder).st_mtime_ns
+        except OSError:
+            mtime = None
+        if initial or mtime != self._dir_mtime or self._unsettled:
+            self._dir_mtime = mtime
+            self._scan(events, initial)
+        if self._fd is None and self._libc is not None and os.path.isdir(self.folder):
+            # Folder (re)appeared - switch back to inotify after a catch-up scan
+            self._start_inotify()
+            self._scan(events)
+
+    def poll(self, timeout=0):
+        """Wait up to timeout seconds for changes; return [("add" | "remove", path), ...]"""
+        events = []
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = max(0.0, deadline - time.monotonic())
+            if self._fd is not None:
+                ready, _, _ = select.select([self._fd], [], [], remaining)
+                if ready:
+                    self._read_inotify(events)
+            else:
+                self._poll_folder(events)
+                if not events and remaining > 0:
+                    time.sleep(min(self.poll_interval, remaining))
+                    self._poll_folder(events)
+            if events or time.monotonic() >= deadline:
+                return events
+
+    def wait(self, timeout):
+        """Sleep up to timeout seconds, returning early as soon as an image is added"""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            if any(kind == "add" for kind, _ in self.poll(remaining)):
+                return True
+
+    def cycle(self, idle=5):
+        """
+        Yield image paths in sorted order forever. Newly added images are
+        yielded next, ahead of the normal order.
+        """
+        current = None
+        while True:
+            self.poll(0)
+            if self._pending:
+                current = self._pending.pop(0)
+            elif self.images:
+                i = bisect.bisect_right(self.images, current) if current is not None else 0
+                current = self.images[i % len(self.images)]
+            else:
+                print("No images found, waiting...")
+                self.wait(idle)
+                continue
+            yield os.path.join(self.folder, current)
+
+    def requeue(self, path):
+        """Have cycle() yield path again once the images already pending are shown"""
+        name = os.path.basename(path)
+        if name in self.images and name not in self._pending:
+            self._pending.append(name)
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
@@ -1,92 +1,116 @@
 #!/usr/bin/env python3
+"""
+Batch-convert an image folder into e-paper layers, to check a generation
+batch before deploying it.
+
+    python3 test-slideshow.py                        # ./pics, previews next to the images
+    python3 test-slideshow.py batch/ -o out/ --bin   # also write packed planes
+
+Every image gets <name>_black.png and <name>_red.png previews, and with
+--bin <name>_black.bin and <name>_red.bin: the raw packed planes as sent to
+the panel RAM, 8 pixels per byte, leftmost pixel in the high bit; 1 = white
+in the black plane and 1 = red in the red plane. Images are converted in
+parallel, one worker process per core, and reported as they finish. Images
+whose outputs are newer than the source are skipped unless --force is given.
+"""
+import argparse
 import os
 import time
-from PIL import Image
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from epaper import DITHER_MODES, list_images, load_frame
+from epaper.frame import WIDTH, HEIGHT
 
 IMG_DIR = "./pics"  # Use local pics folder
-DELAY_SECONDS = 5   # Faster for testing
-
-def list_images(folder):
-    exts = (".png", ".jpg", ".jpeg", ".bmp")
-    if not os.path.isdir(folder):
-        print("Image folder does not exist:", folder)
-        return []
-    files = [f for f in os.listdir(folder) if f.lower().endswith(exts)]
-    files.sort()
-    return [os.path.join(folder, f) for f in files]
-
-def prepare_image(img, width, height):
-    """Prepare image: rotate if portrait, resize."""
-    if img.height > img.width:
-        img = img.rotate(-90, expand=True)
-    return img.resize((width, height))
-
-def convert_to_epaper_layers(img, width, height):
-    """
-    Convert full-color image into two 1-bit layers:
-    - black layer
-    - red layer
-    All others become white.
-    """
-    img = img.convert("RGB")  # keep color info
-
-    black_layer = Image.new("1", (width, height), 255)  # white
-    red_layer   = Image.new("1", (width, height), 255)  # white
-
-    pixels = img.load()
-    black_pixels = black_layer.load()
-    red_pixels = red_layer.load()
-
-    for y in range(height):
-        for x in range(width):
-            r, g, b = pixels[x, y]
-
-            # Decide red
-            # Strong red is: high R, low G, low B
-            if r > 150 and g < 80 and b < 80:
-                red_pixels[x, y] = 0  # show red
-                continue
+LAYERS = ("black", "red")
 
-            # Decide black
-            # Dark pixel if average < 100
-            if (r + g + b) / 3 < 100:
-                black_pixels[x, y] = 0  # show black
-                continue
 
-            # Otherwise: pixel stays white (255)
+def output_paths(path, out_dir, formats):
+    """(layer, format, file) for everything written for one source image"""
+    basename = os.path.splitext(os.path.basename(path))[0]
+    return [(layer, ext, os.path.join(out_dir, f"{basename}_{layer}.{ext}")) for ext in formats for layer in LAYERS]
+
+
+def previews(images, out_dir):
+    """Preview files the images get in out_dir - not sources themselves when it is the image folder"""
+    return {os.path.realpath(out) for path in images for _, _, out in output_paths(path, out_dir, ("png",))}
+
+
+def up_to_date(path, outputs):
+    try:
+        source_mtime = os.stat(path).st_mtime_ns
+        return all(os.stat(out).st_mtime_ns >= source_mtime for _, _, out in outputs)
+    except FileNotFoundError:
+        return False
+
+
+def convert(path, outputs, width, height, use_alpha, dither):
+    """Worker: convert one image and write its outputs; returns seconds spent"""
+    start = time.perf_counter()
+    frame = load_frame(path, width, height, use_alpha=use_alpha, dither=dither)
+    layers = dict(zip(LAYERS, frame.to_layers()))
+    planes = {"black": frame.black, "red": np.invert(frame.red)}  # as send_planes writes them
+    for layer, ext, out in outputs:
+        if ext == "png":
+            layers[layer].save(out)
+        else:
+            planes[layer].tofile(out)
+    return time.perf_counter() - start
 
-    return black_layer, red_layer
 
 def main():
-    WIDTH, HEIGHT = 800, 480  # E-ink dimensions
-    
-    images = list_images(IMG_DIR)
+    parser = argparse.ArgumentParser(description="Convert an image folder into black/red e-paper layers")
+    parser.add_argument("folder", nargs="?", default=IMG_DIR, help=f"image folder (default: {IMG_DIR})")
+    parser.add_argument("-o", "--output", help="output folder (default: the image folder)")
+    parser.add_argument("--bin", action="store_true", help="also write packed .bin planes")
+    parser.add_argument("--no-png", action="store_true", help="skip the PNG previews")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="worker processes (default: all cores)")
+    parser.add_argument("-f", "--force", action="store_true", help="convert even if the outputs are up to date")
+    parser.add_argument("--width", type=int, default=WIDTH)
+    parser.add_argument("--height", type=int, default=HEIGHT)
+    parser.add_argument("--use-alpha", action="store_true", help="treat transparent pixels as white")
+    parser.add_argument("--dither", choices=DITHER_MODES, help="dither gradients instead of thresholding")
+    args = parser.parse_args()
+
+    formats = (() if args.no_png else ("png",)) + (("bin",) if args.bin else ())
+    if not formats:
+        parser.error("nothing to write: --no-png needs --bin")
+    out_dir = args.output or args.folder
+    os.makedirs(out_dir, exist_ok=True)
+
+    images = list_images(args.folder)
+    written = previews(images, out_dir)
+    images = [p for p in images if os.path.realpath(p) not in written]
     if not images:
         print("No images found.")
         return
 
-    print("Found images:")
-    for p in images:
-        print("  ", p)
-
-    for path in images:
-        print("Processing:", path)
-
-        try:
-            img = Image.open(path)
-        except Exception as e:
-            print("Could not open image:", e)
-            continue
+    jobs = {path: output_paths(path, out_dir, formats) for path in images}
+    if not args.force:
+        jobs = {path: outputs for path, outputs in jobs.items() if not up_to_date(path, outputs)}
+    skipped = len(images) - len(jobs)
+    print(f"Found {len(images)} images, {len(jobs)} to convert ({skipped} up to date)")
+
+    start = time.perf_counter()
+    failed = 0
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        futures = {pool.submit(convert, path, outputs, args.width, args.height, args.use_alpha, args.dither): path
+                   for path, outputs in jobs.items()}
+        for done, future in enumerate(as_completed(futures), 1):
+            path = futures[future]
+            try:
+                seconds = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"[{done}/{len(jobs)}] ❌ {path}: {e}")
+                continue
+            print(f"[{done}/{len(jobs)}] ✅ {path} ({seconds * 1000:.0f}ms)")
 
-        img = prepare_image(img, WIDTH, HEIGHT)
-        black, red = convert_to_epaper_layers(img, WIDTH, HEIGHT)
+    elapsed = time.perf_counter() - start
+    print(f"Converted {len(jobs) - failed} images in {elapsed:.1f}s, {failed} failed, {skipped} up to date")
 
-        # Save processed images for inspection
-        basename = os.path.splitext(os.path.basename(path))[0]
-        black.save(f"./pics/{basename}_black.png")
-        red.save(f"./pics/{basename}_red.png")
-        
-        print(f"✅ Processed {path} -> black/red layers saved")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()